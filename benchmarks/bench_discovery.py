@@ -0,0 +1,93 @@
+"""Benchmark discovery of .py files in a project with a large virtual environment.
+
+Builds a synthetic project that isn't managed by Git, with a small amount of project
+code and a large .venv/. Then compares the previous rglob()-based discovery with the
+current walker, which never descends into .venv/.
+
+Usage:
+    $ python benchmarks/bench_discovery.py
+    $ python benchmarks/bench_discovery.py --venv-packages 2000
+"""
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+from py_bugger.utils import file_utils
+
+
+def build_project(root_dir, num_modules, num_venv_packages):
+    """Build a project with num_modules .py files, and a large .venv/."""
+    for index in range(num_modules):
+        path = root_dir / "src" / f"pkg_{index % 10}" / f"module_{index}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("import os\n\nprint(os.sep)\n")
+
+    path_site_packages = root_dir / ".venv" / "lib" / "python3.12" / "site-packages"
+    for index in range(num_venv_packages):
+        path_package = path_site_packages / f"package_{index}"
+        (path_package / "sub").mkdir(parents=True)
+        for name in ("__init__.py", "core.py", "sub/__init__.py", "sub/utils.py"):
+            (path_package / name).write_text("")
+
+
+def get_py_files_rglob(target_dir):
+    """Discovery as it was before the walker: rglob(), then filter by substring."""
+    exclude_dirs = [
+        ".venv/",
+        "venv/",
+        "tests/",
+        "Tests/",
+        "test_code/",
+        "build/",
+        "dist/",
+    ]
+    py_files = [
+        pf
+        for pf in target_dir.rglob("*.py")
+        if not any(ex_dir in pf.as_posix() for ex_dir in exclude_dirs)
+    ]
+    py_files = [pf for pf in py_files if pf.name != "conftest.py"]
+    return [pf for pf in py_files if not pf.name.startswith("test_")]
+
+
+def time_discovery(get_py_files, target_dir, repeat):
+    """Return the best time out of repeat runs, and the files found."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        py_files = get_py_files(target_dir)
+        times.append(time.perf_counter() - start)
+    return min(times), py_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--venv-packages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root_dir = Path(tmp_dir)
+        build_project(root_dir, args.modules, args.venv_packages)
+
+        time_rglob, files_rglob = time_discovery(
+            get_py_files_rglob, root_dir, args.repeat
+        )
+        time_walker, files_walker = time_discovery(
+            file_utils._get_py_files_non_git, root_dir, args.repeat
+        )
+
+    assert sorted(files_rglob) == sorted(files_walker)
+
+    num_venv_files = args.venv_packages * 4
+    print(f"Project files: {args.modules}, .venv files: {num_venv_files}")
+    print(f"rglob():  {time_rglob * 1000:8.2f} ms")
+    print(f"walker:   {time_walker * 1000:8.2f} ms")
+    print(f"speedup:  {time_rglob / time_walker:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare two results files from run_benchmarks.py, and flag regressions.
+
+A phase has regressed if it's slower than the baseline by more than the threshold,
+and by more than the noise floor. Exits with status 1 if anything has regressed.
+
+Usage:
+    $ python benchmarks/compare.py benchmarks/results/baseline.json new.json
+    $ python benchmarks/compare.py baseline.json new.json --threshold 0.1
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+
+def compare(baseline, current, threshold, noise_floor):
+    """Compare results, matching benchmarks by corpus, bugger, and number of bugs.
+
+    Returns:
+        List: (label, phase, baseline time, current time) for each regression.
+    """
+    baseline_results = {_get_key(result): result for result in baseline["results"]}
+
+    regressions = []
+    for result in current["results"]:
+        key = _get_key(result)
+        if key not in baseline_results:
+            continue
+        baseline_result = baseline_results[key]
+
+        times = [
+            (phase, baseline_result["phases"].get(phase, 0.0), new)
+            for phase, new in result["phases"].items()
+        ]
+        times.append(("total", baseline_result["total"], result["total"]))
+
+        label = f"{key[0]} files, {key[1]}, -n {key[2]}"
+        for phase, old, new in times:
+            if new - old > noise_floor and new > old * (1 + threshold):
+                regressions.append((label, phase, old, new))
+
+        _print_comparison(label, baseline_result["total"], result["total"])
+
+    return regressions
+
+
+# --- Helper functions ---
+
+
+def _get_key(result):
+    return (result["corpus"], result["bugger"], result["num_bugs"])
+
+
+def _print_comparison(label, old, new):
+    change = (new - old) / old if old else 0.0
+    print(f"{label:<40} {old * 1000:9.1f} ms -> {new * 1000:9.1f} ms  ({change:+.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Fraction a phase can slow down by before it's a regression.",
+    )
+    parser.add_argument(
+        "--noise-floor",
+        type=float,
+        default=5.0,
+        help="Changes smaller than this many ms are never regressions.",
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    regressions = compare(baseline, current, args.threshold, args.noise_floor / 1000)
+
+    if not regressions:
+        print("\nNo regressions.")
+        return
+
+    print(f"\n{len(regressions)} regressions:")
+    for label, phase, old, new in regressions:
+        print(f"  {label}, {phase}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Generate synthetic projects to benchmark py-bugger against.
+
+Every file is valid Python, built from a fixed seed, so a corpus with the same
+settings is the same on every run. The density settings control how many
+candidates each kind of bug has:
+- imports: import statements per file (ModuleNotFoundError);
+- attributes: attribute accesses per file (AttributeError);
+- blocks: indented blocks per file (IndentationError).
+
+Usage:
+    $ python benchmarks/corpus.py /tmp/corpus_1k --files 1000
+"""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import random
+
+
+# Named corpus sizes.
+CORPUS_SIZES = {
+    "10": 10,
+    "1k": 1_000,
+    "10k": 10_000,
+}
+
+MODULES = ["os", "sys", "json", "random", "math", "re", "pathlib", "string", "time"]
+ATTRIBUTES = [
+    "os.path.join",
+    "os.sep",
+    "sys.argv",
+    "json.dumps",
+    "random.choice",
+    "math.pi",
+    "re.compile",
+    "string.ascii_letters",
+    "time.perf_counter",
+]
+BLOCKS = ["if", "for", "while", "with", "try"]
+
+
+@dataclass
+class CorpusSettings:
+    files: int = 10
+    imports: int = 4
+    attributes: int = 8
+    blocks: int = 4
+
+    # Files per package directory.
+    files_per_dir: int = 50
+
+    seed: int = 10
+
+
+def build_corpus(root_dir, settings):
+    """Write a synthetic project to root_dir.
+
+    Returns:
+        List: Paths to every .py file in the corpus.
+    """
+    rng = random.Random(settings.seed)
+    root_dir = Path(root_dir)
+
+    paths = []
+    for index in range(settings.files):
+        path_dir = root_dir / "src" / f"pkg_{index // settings.files_per_dir}"
+        path_dir.mkdir(parents=True, exist_ok=True)
+
+        path = path_dir / f"module_{index}.py"
+        path.write_text(_get_module_source(rng, settings))
+        paths.append(path)
+
+    return paths
+
+
+# --- Helper functions ---
+
+
+def _get_module_source(rng, settings):
+    """Get the source for one module."""
+    lines = ['"""Synthetic module."""', ""]
+    for _ in range(settings.imports):
+        lines.append(f"import {rng.choice(MODULES)}")
+
+    # Spread attributes across functions, with one block in each function.
+    num_functions = max(1, settings.blocks)
+    attributes = [rng.choice(ATTRIBUTES) for _ in range(settings.attributes)]
+    for func_index in range(num_functions):
+        lines += ["", "", f"def func_{func_index}(value):"]
+        func_attributes = attributes[func_index::num_functions]
+
+        if func_index < settings.blocks:
+            lines += _get_block(rng.choice(BLOCKS), func_attributes)
+        else:
+            lines += [f"    print({attr})" for attr in func_attributes]
+        lines.append("    return value")
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _get_block(block, attributes):
+    """Get the lines for one indented block, containing attributes."""
+    body = [f"        print({attr})" for attr in attributes] or ["        pass"]
+    if block == "if":
+        return ["    if value:"] + body
+    if block == "for":
+        return ["    for item in range(3):"] + body
+    if block == "while":
+        return ["    while value:"] + body + ["        value = None"]
+    if block == "with":
+        return ["    with open(__file__) as f:"] + body
+    return ["    try:"] + body + ["    except Exception:", "        pass"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic project.")
+    parser.add_argument("root_dir", type=Path)
+    parser.add_argument("--files", type=int, default=CorpusSettings.files)
+    parser.add_argument("--imports", type=int, default=CorpusSettings.imports)
+    parser.add_argument("--attributes", type=int, default=CorpusSettings.attributes)
+    parser.add_argument("--blocks", type=int, default=CorpusSettings.blocks)
+    parser.add_argument("--seed", type=int, default=CorpusSettings.seed)
+    args = parser.parse_args()
+
+    settings = CorpusSettings(
+        files=args.files,
+        imports=args.imports,
+        attributes=args.attributes,
+        blocks=args.blocks,
+        seed=args.seed,
+    )
+    paths = build_corpus(args.root_dir, settings)
+    print(f"Wrote {len(paths)} files to {args.root_dir.as_posix()}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Measure how long each phase of a run takes, on synthetic projects of several sizes.
+
+For each corpus size, bugger, and number of bugs, py-bugger is run in-process and
+each phase is timed:
+- discovery: finding .py files;
+- collect: reading files, and collecting candidates with ast;
+- select: sampling candidates, apart from collecting them;
+- parse: parsing chosen files with libcst;
+- transform: planning bugs, and applying them to the overlay;
+- write: writing modified files to disk.
+
+Times are exclusive; a phase that runs inside another is only counted once. Each
+measurement is the best of several runs. Modified files are restored between runs.
+
+Results are saved as JSON. Compare two results files with compare.py.
+
+Usage:
+    $ python benchmarks/run_benchmarks.py --output benchmarks/results/baseline.json
+    $ python benchmarks/run_benchmarks.py --sizes 10 1k 10k --num-bugs 1 10 100
+"""
+
+import argparse
+from contextlib import redirect_stdout
+from importlib.metadata import version
+import io
+import json
+from pathlib import Path
+import platform
+import random
+import tempfile
+import time
+
+import corpus
+
+from py_bugger import buggers
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli.config import CANDIDATE_STORES
+from py_bugger.utils import apply_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils import file_utils
+from py_bugger.utils import parse_cache
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.git_utils import git_cache
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.overlay import overlay
+
+# py-bugger imports libcst when it's first needed. Import it here, so the first run
+# doesn't include the time it takes to import libcst.
+from py_bugger.utils import cst_utils
+
+
+PHASES = ["discovery", "collect", "select", "parse", "transform", "write"]
+
+BUGGERS = ["ModuleNotFoundError", "AttributeError", "IndentationError"]
+
+# Functions to time, and the phase each one belongs to.
+TIMED_FUNCTIONS = [
+    (file_utils, "get_py_files", "discovery"),
+    (candidate_utils, "_collect_rows", "collect"),
+    (candidate_utils, "sample_candidates_by_kind", "select"),
+    (parse_cache, "parse_file", "parse"),
+    (buggers, "plan_bugs", "transform"),
+    (apply_utils, "apply_modifications", "transform"),
+    (apply_utils, "write_modifications", "write"),
+]
+
+
+class PhaseTimer:
+    """Accumulate exclusive time for each phase, across nested calls."""
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+        # Time spent in timed calls made by each active timed call.
+        self._child_times = []
+
+    def wrap(self, func, phase):
+        def timed_func(*args, **kwargs):
+            self._child_times.append(0.0)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                child_time = self._child_times.pop()
+                self.phases[phase] += elapsed - child_time
+                if self._child_times:
+                    self._child_times[-1] += elapsed
+
+        return timed_func
+
+    def reset(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+def instrument(tracker):
+    """Wrap every function in TIMED_FUNCTIONS, so tracker measures its phase."""
+    for module, name, phase in TIMED_FUNCTIONS:
+        setattr(module, name, tracker.wrap(getattr(module, name), phase))
+
+
+def run_once(
+    tracker, target_dir, exception_type, num_bugs, jobs, candidate_store="reservoir"
+):
+    """Run py-bugger once, and restore any modified files.
+
+    Returns:
+        Dict: The tracker's measurement for each phase.
+    """
+    _reset_state()
+    pb_config.target_dir = target_dir
+    pb_config.exception_type = (exception_type,)
+    pb_config.num_bugs = num_bugs
+    pb_config.jobs = jobs
+    pb_config.candidate_store = candidate_store
+    random.seed(10)
+
+    # Keep the original source of every file that's about to be written.
+    originals = {}
+    write_modifications = apply_utils.write_modifications
+
+    def recording_write_modifications():
+        originals.update(overlay.originals)
+        write_modifications()
+
+    apply_utils.write_modifications = recording_write_modifications
+    tracker.reset()
+    try:
+        with redirect_stdout(io.StringIO()):
+            py_bugger.main()
+    finally:
+        apply_utils.write_modifications = write_modifications
+
+    for path, source in originals.items():
+        path.write_bytes(source)
+
+    return dict(tracker.phases)
+
+
+def run_benchmarks(
+    sizes, num_bugs_values, repeat, jobs, densities, candidate_store="reservoir"
+):
+    """Run every benchmark, and return a list of results.
+
+    densities is a dict of CorpusSettings values, ie imports, attributes, blocks.
+    """
+    timer = PhaseTimer()
+    instrument(timer)
+
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings = corpus.CorpusSettings(
+                files=corpus.CORPUS_SIZES[size], **densities
+            )
+            corpus.build_corpus(tmp_dir, settings)
+
+            for exception_type in BUGGERS:
+                for num_bugs in num_bugs_values:
+                    runs = [
+                        run_once(
+                            timer,
+                            Path(tmp_dir),
+                            exception_type,
+                            num_bugs,
+                            jobs,
+                            candidate_store,
+                        )
+                        for _ in range(repeat)
+                    ]
+                    phases = {p: min(run[p] for run in runs) for p in PHASES}
+                    total = min(sum(run.values()) for run in runs)
+
+                    result = {
+                        "corpus": size,
+                        "bugger": exception_type,
+                        "num_bugs": num_bugs,
+                        "phases": phases,
+                        "total": total,
+                    }
+                    results.append(result)
+                    _print_result(result)
+
+    return results
+
+
+# --- Helper functions ---
+
+
+def _reset_state():
+    """Reset everything a run changes, as the integration tests do."""
+    pb_config.exception_type = ()
+    pb_config.target_file = ""
+    pb_config.target_lines = ""
+    pb_config.include = ()
+    pb_config.exclude = ()
+    pb_config.ignore_git_status = True
+    pb_config.candidate_quota = 0
+    pb_config.candidate_store = "reservoir"
+    pb_config.dry_run = False
+    pb_config.patch_file = ""
+    pb_config.verbose = False
+
+    modifications.clear()
+    parse_cache.parsed_files.clear()
+    candidate_index.clear()
+    overlay.clear()
+    git_cache.clear()
+
+
+def _print_result(result):
+    corpus, bugger, num_bugs = result["corpus"], result["bugger"], result["num_bugs"]
+    label = f"{corpus:>4} files  {bugger:<20} -n {num_bugs:<4}"
+    phases = "  ".join(f"{p} {t * 1000:7.1f}" for p, t in result["phases"].items())
+    print(f"{label} total {result['total'] * 1000:8.1f} ms  |  {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each phase of a run.")
+    parser.add_argument(
+        "--sizes", nargs="+", default=["10", "1k"], choices=list(corpus.CORPUS_SIZES)
+    )
+    parser.add_argument("--num-bugs", nargs="+", type=int, default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument(
+        "--candidate-store", default="reservoir", choices=CANDIDATE_STORES
+    )
+    parser.add_argument("--imports", type=int, default=corpus.CorpusSettings.imports)
+    parser.add_argument(
+        "--attributes", type=int, default=corpus.CorpusSettings.attributes
+    )
+    parser.add_argument("--blocks", type=int, default=corpus.CorpusSettings.blocks)
+    parser.add_argument("--output", type=Path, help="Where to save results, as JSON.")
+    args = parser.parse_args()
+
+    densities = {
+        "imports": args.imports,
+        "attributes": args.attributes,
+        "blocks": args.blocks,
+    }
+    results = run_benchmarks(
+        args.sizes,
+        args.num_bugs,
+        args.repeat,
+        args.jobs,
+        densities,
+        args.candidate_store,
+    )
+
+    if args.output:
+        data = {
+            "meta": {
+                "py_bugger_version": version("python-bugger"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "jobs": args.jobs,
+                "candidate_store": args.candidate_store,
+                "repeat": args.repeat,
+                "densities": densities,
+            },
+            "results": results,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(data, indent=2))
+        print(f"\nSaved results to {args.output.as_posix()}.")
+
+
+if __name__ == "__main__":
+    main()
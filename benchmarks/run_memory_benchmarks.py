@@ -0,0 +1,198 @@
+"""Measure peak memory use in each phase of a run, and check it against budgets.
+
+Runs py-bugger in-process against synthetic projects, as run_benchmarks.py does.
+For each phase, two measurements are recorded:
+- peak_mb: the highest memory traced by tracemalloc at any point in the phase;
+- rss_mb: the process's resident set size when the phase finishes, or None on
+  platforms where it can't be read, such as Windows.
+
+Peaks include everything still alive from earlier phases, because that's what counts
+toward running out of memory. tracemalloc adds overhead of its own, so RSS is higher
+than it would be in a normal run.
+
+Budgets in memory_budgets.json set the maximum peak_mb and rss_mb for each corpus
+size. If any phase goes over budget, the script exits with status 1.
+
+Usage:
+    $ python benchmarks/run_memory_benchmarks.py
+    $ python benchmarks/run_memory_benchmarks.py --sizes 10k --output memory.json
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+
+import corpus
+import run_benchmarks
+
+
+PATH_BUDGETS = Path(__file__).parent / "memory_budgets.json"
+
+MB = 1024 * 1024
+
+
+class MemoryTracker:
+    """Record peak traced memory, and RSS, for each phase across nested calls."""
+
+    def __init__(self):
+        self.reset()
+
+    def wrap(self, func, phase):
+        def tracked_func(*args, **kwargs):
+            # tracemalloc has a single peak. Remember the caller's peak so far, and
+            # restart the peak for this call.
+            if self._frames:
+                self._frames[-1] = max(
+                    self._frames[-1], tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+            self._frames.append(0)
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                peak = max(self._frames.pop(), tracemalloc.get_traced_memory()[1])
+                self.phases[phase]["peak_mb"] = max(
+                    self.phases[phase]["peak_mb"], peak / MB
+                )
+                if (rss := _get_rss()) is not None:
+                    rss_mb = self.phases[phase]["rss_mb"] or 0.0
+                    self.phases[phase]["rss_mb"] = max(rss_mb, rss / MB)
+
+                # The caller's peak includes this call's peak.
+                if self._frames:
+                    self._frames[-1] = max(self._frames[-1], peak)
+                tracemalloc.reset_peak()
+
+        return tracked_func
+
+    def reset(self):
+        self.phases = {
+            phase: {"peak_mb": 0.0, "rss_mb": None} for phase in run_benchmarks.PHASES
+        }
+        self._frames = []
+
+
+def run_memory_benchmarks(sizes, num_bugs_values, jobs):
+    """Run every memory benchmark, and return a list of results."""
+    tracker = MemoryTracker()
+    run_benchmarks.instrument(tracker)
+
+    results = []
+    tracemalloc.start()
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                settings = corpus.CorpusSettings(files=corpus.CORPUS_SIZES[size])
+                corpus.build_corpus(tmp_dir, settings)
+
+                for exception_type in run_benchmarks.BUGGERS:
+                    for num_bugs in num_bugs_values:
+                        phases = run_benchmarks.run_once(
+                            tracker, Path(tmp_dir), exception_type, num_bugs, jobs
+                        )
+                        result = {
+                            "corpus": size,
+                            "bugger": exception_type,
+                            "num_bugs": num_bugs,
+                            "phases": phases,
+                        }
+                        results.append(result)
+                        _print_result(result)
+    finally:
+        tracemalloc.stop()
+
+    return results
+
+
+def check_budgets(results, budgets):
+    """Get a message for each measurement that went over its corpus's budget."""
+    failures = []
+    for result in results:
+        budget = budgets.get(result["corpus"], {})
+        label = f"{result['corpus']} files, {result['bugger']}, -n {result['num_bugs']}"
+
+        for phase, memory in result["phases"].items():
+            for key, limit in budget.items():
+                # RSS isn't available on every platform.
+                if memory[key] is not None and memory[key] > limit:
+                    failures.append(
+                        f"{label}, {phase} {key}: {memory[key]:.1f} MB > {limit} MB"
+                    )
+
+    return failures
+
+
+# --- Helper functions ---
+
+
+def _get_rss():
+    """Get the current resident set size, in bytes.
+
+    Where /proc isn't available, use the process's peak RSS instead. Returns None
+    where neither is available, such as on Windows.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in KB on Linux, and bytes on macOS.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _print_result(result):
+    corpus, bugger, num_bugs = result["corpus"], result["bugger"], result["num_bugs"]
+    label = f"{corpus:>4} files  {bugger:<20} -n {num_bugs:<4}"
+    phases = "  ".join(
+        f"{phase} {memory['peak_mb']:6.1f}"
+        for phase, memory in result["phases"].items()
+    )
+    rss_values = [
+        m["rss_mb"] for m in result["phases"].values() if m["rss_mb"] is not None
+    ]
+    rss = f"{max(rss_values):7.1f} MB" if rss_values else "    n/a   "
+    print(f"{label} rss {rss}  |  peak MB: {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory in each phase.")
+    parser.add_argument(
+        "--sizes", nargs="+", default=["10", "1k"], choices=list(corpus.CORPUS_SIZES)
+    )
+    parser.add_argument("--num-bugs", nargs="+", type=int, default=[1, 10])
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--budgets", type=Path, default=PATH_BUDGETS)
+    parser.add_argument("--output", type=Path, help="Where to save results, as JSON.")
+    args = parser.parse_args()
+
+    results = run_memory_benchmarks(args.sizes, args.num_bugs, args.jobs)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"results": results}, indent=2))
+        print(f"\nSaved results to {args.output.as_posix()}.")
+
+    budgets = json.loads(args.budgets.read_text())
+    if failures := check_budgets(results, budgets):
+        print(f"\n{len(failures)} phases over budget:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+    print("\nAll phases within budget.")
+
+
+if __name__ == "__main__":
+    main()
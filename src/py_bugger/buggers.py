@@ -5,94 +5,137 @@ be a class. Also, not sure we need separate bugger functions, or one bugger func
 conditional logic. Implement support for another exception type, and logical errors, and see what
 things are looking like.
 """
-import random
+from collections import Counter
+import sys
+import time
 
-import libcst as cst
-from libcst.metadata import MetadataWrapper, PositionProvider
-
-from py_bugger.utils import cst_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils import parse_cache
 from py_bugger.utils import file_utils
 from py_bugger.utils import bug_utils
+from py_bugger.utils.events import events
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.profiler import profiler
 
 from py_bugger.cli.config import pb_config
 
 
-### --- *_bugger functions ---
-
+def plan_bugs(py_files, requested_bugs):
+    """Plan every requested bug, before any file is modified.
 
-def module_not_found_bugger(py_files):
-    """Induce a ModuleNotFoundError.
+    Candidates for every kind of bug are sampled in one pass over the project, with
+    room for every bug of each kind, and each bug takes the next candidate that's
+    still unmodified. Once a kind runs out of candidates, later bugs of that kind
+    fail without sampling again. Files don't change until every bug is planned, so
+    bugs that break parsing can be planned in any order.
 
     Returns:
-        Bool: Whether a bug was introduced or not.
+        Int: Number of bugs planned.
     """
-    # Get a random node that hasn't already been modified.
-    path, node = _get_random_node(py_files, node_type=cst.Import)
-    if not path:
-        return False
+    num_requested = Counter(requested_bugs)
+    sample_sizes = {
+        candidate_utils.BUG_KINDS[bug]: k for bug, k in num_requested.items()
+    }
+    samples = candidate_utils.sample_candidates_by_kind(py_files, sample_sizes)
 
-    # Parse user's code.
-    source = path.read_text()
-    tree = cst.parse_module(source)
-    wrapper = MetadataWrapper(tree)
-    metadata = wrapper.resolve(PositionProvider)
+    candidates = {}
+    num_added = 0
+    for bug in requested_bugs:
+        if bug not in candidates:
+            kind = candidate_utils.BUG_KINDS[bug]
+            candidates[bug] = _get_unmodified_candidates(
+                py_files, kind, num_requested[bug], sample=samples[kind]
+            )
 
-    # Modify user's code
-    try:
-        modified_tree = wrapper.module.visit(cst_utils.ImportModifier(node, path, metadata))
-    except TypeError:
-        # DEV: Figure out which nodes are ending up here, and update
-        # modifier code to handle these nodes.
-        # For diagnostics, can run against Pillow with -n set to a
-        # really high number.
-        raise
-    else:
-        path.write_text(modified_tree.code)
-        _report_bug_added(path)
-        return True
+        if BUGGERS[bug](py_files, candidates[bug]):
+            num_added += 1
 
+    # Modifications don't refer to parsed trees, so they can all be released now.
+    parse_cache.parsed_files.clear()
+
+    return num_added
 
-def attribute_error_bugger(py_files):
-    """Induce an AttributeError.
+
+### --- *_bugger functions ---
+
+
+def module_not_found_bugger(py_files, candidates=None):
+    """Induce a ModuleNotFoundError.
 
     Returns:
         Bool: Whether a bug was introduced or not.
-    """
-    # Get a random node that hasn't already been modified.
-    path, node = _get_random_node(py_files, node_type=cst.Attribute)
-    if not path:
-        return False
 
-    # Parse user's code.
-    source = path.read_text()
-    tree = cst.parse_module(source)
-    wrapper = MetadataWrapper(tree)
-    metadata = wrapper.resolve(PositionProvider)
-
-    # Pick node to modify if more than one match in the file.
-    # Note that not all bugger functions need this step.
-    node_count = cst_utils.count_nodes(tree, node)
-    if node_count > 1:
-        node_index = random.randrange(0, node_count - 1)
-    else:
-        node_index = 0
-
-    # Modify user's code.
-    try:
-        modified_tree = wrapper.module.visit(cst_utils.AttributeModifier(node, node_index, path, metadata))
-    except TypeError:
-        # DEV: Figure out which nodes are ending up here, and update
-        # modifier code to handle these nodes.
-        # For diagnostics, can run against Pillow with -n set to a
-        # really high number.
-        raise
-    else:
-        path.write_text(modified_tree.code)
-        _report_bug_added(path)
-        return True
+    The planner passes candidates, an iterator shared by every bug of this kind.
+    Otherwise, candidates are sampled for just this bug.
+    """
+    start = time.perf_counter()
+    cst_utils = _import_cst_utils()
+
+    # Try random candidates that haven't already been modified.
+    candidates = candidates or _get_unmodified_candidates(py_files, "import")
+    for candidate in candidates:
+        # Get the parsed version of the user's code.
+        if not (parsed_file := _get_parsed_file(candidate.path)):
+            continue
+
+        # Stage a modification to the user's code.
+        import_modifier = cst_utils.ImportModifier(candidate, parsed_file.metadata)
+        try:
+            parsed_file.module.visit(import_modifier)
+        except TypeError:
+            # DEV: Figure out which nodes are ending up here, and update
+            # modifier code to handle these nodes.
+            # For diagnostics, can run against Pillow with -n set to a
+            # really high number.
+            raise
+
+        if import_modifier.bug_generated:
+            _report_bug_added(candidate, start)
+            return True
+
+    return False
+
+
+def attribute_error_bugger(py_files, candidates=None):
+    """Induce an AttributeError.
 
+    Returns:
+        Bool: Whether a bug was introduced or not.
 
-def indentation_error_bugger(py_files):
+    The planner passes candidates, an iterator shared by every bug of this kind.
+    Otherwise, candidates are sampled for just this bug.
+    """
+    start = time.perf_counter()
+    cst_utils = _import_cst_utils()
+
+    # Try random candidates that haven't already been modified.
+    candidates = candidates or _get_unmodified_candidates(py_files, "attribute")
+    for candidate in candidates:
+        # Get the parsed version of the user's code.
+        if not (parsed_file := _get_parsed_file(candidate.path)):
+            continue
+
+        # Stage a modification to the user's code.
+        attribute_modifier = cst_utils.AttributeModifier(
+            candidate, parsed_file.metadata
+        )
+        try:
+            parsed_file.module.visit(attribute_modifier)
+        except TypeError:
+            # DEV: Figure out which nodes are ending up here, and update
+            # modifier code to handle these nodes.
+            # For diagnostics, can run against Pillow with -n set to a
+            # really high number.
+            raise
+
+        if attribute_modifier.bug_generated:
+            _report_bug_added(candidate, start)
+            return True
+
+    return False
+
+
+def indentation_error_bugger(py_files, candidates=None):
     """Induce an IndentationError.
 
     This simply parses raw source files. Conditions are pretty concrete, and LibCST
@@ -100,62 +143,103 @@ def indentation_error_bugger(py_files):
 
     Returns:
         Bool: Whether a bug was introduced or not.
+
+    The planner passes candidates, an iterator shared by every bug of this kind.
+    Otherwise, candidates are sampled for just this bug.
     """
-    # Find relevant files and lines.
-    targets = [
-        "for",
-        "while",
-        "def",
-        "class",
-        "if",
-        "with",
-        "match",
-        "try",
-    ]
-
-    # We only need line numbers, not actual lines.
-    paths_linenums = file_utils.get_paths_linenums(py_files, targets=targets)
-
-    # Bail if there are no relevant lines.
-    if not paths_linenums:
-        return False
+    start = time.perf_counter()
+
+    # Sample lines that open a block, and haven't already been modified.
+    candidates = candidates or _get_unmodified_candidates(py_files, "indentation")
 
-    path, target_linenum = random.choice(paths_linenums)
+    # Bail if there are no relevant lines. Sampled lines are already in random order.
+    if not (candidate := next(candidates, None)):
+        return False
 
-    if bug_utils.add_indentation_linenum(path, target_linenum):
-        _report_bug_added(path)
+    if bug_utils.add_indentation(candidate):
+        _report_bug_added(candidate, start)
         return True
 
+    return False
+
+
+# Bugger for each supported exception type.
+BUGGERS = {
+    "ModuleNotFoundError": module_not_found_bugger,
+    "AttributeError": attribute_error_bugger,
+    "IndentationError": indentation_error_bugger,
+}
+
 
 # --- Helper functions ---
 # DEV: This is a good place for helper functions, before they are refined enough
 # to move to utils/.
 
 
-def _report_bug_added(path_modified):
-    """Report that a bug was added."""
+def _import_cst_utils():
+    """Import cst_utils, which imports libcst.
+
+    Importing libcst here keeps it out of runs that only make line-based bugs. The
+    first import is slow, so it's profiled as its own phase.
+    """
+    if (cst_utils := sys.modules.get("py_bugger.utils.cst_utils")) is None:
+        with profiler.phase("import"):
+            from py_bugger.utils import cst_utils
+    return cst_utils
+
+
+def _report_bug_added(candidate, start):
+    """Report that a bug was added, which started being planned at start.
+
+    In a dry run, stdout is for the patch, so status messages go to stderr.
+    """
+    file = sys.stderr if pb_config.dry_run else sys.stdout
     if pb_config.verbose:
-        print(f"Added bug to: {path_modified.as_posix()}")
+        print(f"Added bug to: {candidate.path.as_posix()}", file=file)
     else:
-        print(f"Added bug.")
+        print(f"Added bug.", file=file)
 
+    events.emit(
+        "on_bug_planned",
+        path=candidate.path,
+        candidate=candidate,
+        modification=modifications[-1],
+        elapsed=time.perf_counter() - start,
+    )
 
-def _get_random_node(py_files, node_type):
-    """Randomly select a node to modify.
 
-    Make sure it's a node that hasn't already been modified.
+def _get_unmodified_candidates(py_files, kind, k=None, sample=None):
+    """Yield random candidates that haven't already been modified.
 
-    Returns:
-        Tuple: (path, node) or (False, False)
+    No file needs to be parsed to find these candidates. A sample of k candidates
+    is drawn first, with k defaulting to num_bugs, unless that sample is passed in.
+    Candidates can fail, eg if their file can't be parsed. If the whole sample is
+    used up and there may be more candidates, a sample twice as large is drawn,
+    skipping candidates already yielded.
     """
-    # Find all relevant nodes. Bail if there are no relevant nodes.
-    if not (paths_nodes := cst_utils.get_paths_nodes(py_files, node_type)):
-        return False, False
-
-    random.shuffle(paths_nodes)
-    for path, node in paths_nodes:
-        if file_utils.check_unmodified(path, candidate_node=node):
-            return path, node
-    else:
-        # All nodes have already been modified to introduce a previous bug.
-        return False, False
+    k = k or pb_config.num_bugs
+    yielded = set()
+    while True:
+        if sample is None:
+            sample = candidate_utils.sample_candidates(py_files, kind, k=k)
+        for candidate in sample:
+            if candidate not in yielded and file_utils.check_unmodified(candidate):
+                yielded.add(candidate)
+                yield candidate
+
+        # A sample smaller than k holds every candidate there is.
+        if len(sample) < k:
+            return
+        k *= 2
+        sample = None
+
+
+def _get_parsed_file(path):
+    """Get the parsed version of a file, or None if libcst can't parse it."""
+    import libcst as cst
+
+    try:
+        return parse_cache.get_parsed_file(path)
+    except cst.ParserSyntaxError:
+        profiler.count("parse_failures")
+        return None
@@ -20,7 +20,13 @@ def success_msg():
 
     # Show a final success/fail message.
     num_added = len(modifications)
-    if num_added == pb_config.num_bugs:
+    if pb_config.dry_run and num_added == pb_config.num_bugs:
+        return "Dry run: all requested bugs planned. No files were modified."
+    elif pb_config.dry_run and num_added:
+        msg = f"Dry run: planned {num_added} bugs. No files were modified."
+        msg += "\nUnable to plan additional bugs of the requested type."
+        return msg
+    elif num_added == pb_config.num_bugs:
         return "All requested bugs inserted."
     elif num_added == 0:
         return "Unable to introduce any of the requested bugs."
@@ -30,6 +36,12 @@ def success_msg():
         return msg
 
 
+def msg_index_built(num_files, path_cache_dir):
+    """Report that the candidate index has been built."""
+    msg = f"Indexed {num_files} files in {path_cache_dir.as_posix()}."
+    return msg
+
+
 # Validation for exception type.
 def msg_apparent_typo(actual, expected):
     """Suggest a typo fix for an exception type."""
@@ -104,6 +116,21 @@ def msg_invalid_target_lines(end_line, target_file, file_length):
     msg = f"You asked to target a block ending at line {end_line}, but {target_file.as_posix()} only has {file_length} lines."
     return msg
 
+
+# Messages for --jobs.
+def msg_invalid_jobs(jobs):
+    """Passed a number of jobs that's less than 1."""
+    msg = f"You asked for {jobs} jobs. Please pass a value of 1 or more for --jobs."
+    return msg
+
+
+# Messages for --candidate-quota.
+def msg_invalid_candidate_quota(candidate_quota):
+    """Passed a negative candidate quota."""
+    msg = f"You asked for a quota of {candidate_quota} candidates. Please pass a value of 0 or more for --candidate-quota."
+    return msg
+
+
 # Messages for Git status-related issues.
 def msg_git_not_used(pb_config):
     """Git is not being used to manage target file or directory."""
@@ -7,10 +7,6 @@ filenames.
 import os
 import sys
 from pathlib import Path
-import subprocess
-import shlex
-import shutil
-import difflib
 
 import click
 
@@ -27,6 +23,8 @@ def validate_config():
         sys.exit()
 
     _validate_exception_type()
+    _validate_jobs()
+    _validate_candidate_quota()
 
     if pb_config.target_dir:
         _validate_target_dir()
@@ -44,6 +42,19 @@ def validate_config():
     _validate_git_status()
 
 
+def validate_index_config():
+    """Make sure the options for `py-bugger index` are valid.
+
+    Indexing doesn't modify any code, so there's no need to check Git status.
+    """
+    if pb_config.target_dir:
+        _validate_target_dir()
+
+    _validate_jobs()
+
+    _update_options()
+
+
 # --- Helper functions ___
 
 
@@ -57,24 +68,36 @@ def _update_options():
 
 
 def _validate_exception_type():
-    """Make sure the -e arg provided is supported."""
-    if not pb_config.exception_type:
-        return
+    """Make sure each -e arg provided is supported."""
+    # A single type may be set directly, rather than through the CLI.
+    if isinstance(pb_config.exception_type, str):
+        pb_config.exception_type = (
+            (pb_config.exception_type,) if pb_config.exception_type else ()
+        )
+
+    # Passing the same type more than once doesn't change the mix of bugs.
+    pb_config.exception_type = tuple(dict.fromkeys(pb_config.exception_type))
 
-    if pb_config.exception_type in SUPPORTED_EXCEPTION_TYPES:
+    for exception_type in pb_config.exception_type:
+        _validate_single_exception_type(exception_type)
+
+
+def _validate_single_exception_type(exception_type):
+    """Make sure one -e arg is supported."""
+    if exception_type in SUPPORTED_EXCEPTION_TYPES:
         return
 
     # Check for typos.
-    matches = difflib.get_close_matches(
-        pb_config.exception_type, SUPPORTED_EXCEPTION_TYPES, n=1
-    )
+    import difflib
+
+    matches = difflib.get_close_matches(exception_type, SUPPORTED_EXCEPTION_TYPES, n=1)
     if matches:
-        msg = cli_messages.msg_apparent_typo(pb_config.exception_type, matches[0])
+        msg = cli_messages.msg_apparent_typo(exception_type, matches[0])
         click.echo(msg)
         sys.exit()
 
     # Invalid or unsupported exception type.
-    msg = cli_messages.msg_unsupported_exception_type(pb_config.exception_type)
+    msg = cli_messages.msg_unsupported_exception_type(exception_type)
     click.echo(msg)
     sys.exit()
 
@@ -137,9 +160,11 @@ def _validate_target_lines():
         target_line = int(pb_config.target_lines.strip())
 
         # Make sure this line is in the target file.
-        lines = pb_config.target_file.read_text().splitlines()
+        lines = pb_config.target_file.read_bytes().splitlines()
         if target_line > len(lines):
-            msg = cli_messages.msg_invalid_target_line(target_line, pb_config.target_file, len(lines))
+            msg = cli_messages.msg_invalid_target_line(
+                target_line, pb_config.target_file, len(lines)
+            )
             click.echo(msg)
             sys.exit()
 
@@ -152,18 +177,37 @@ def _validate_target_lines():
     start, end = int(start), int(end)
 
     # Make sure end line is in the target file.
-    lines = pb_config.target_file.read_text().splitlines()
+    lines = pb_config.target_file.read_bytes().splitlines()
     if end > len(lines):
-        msg = cli_messages.msg_invalid_target_lines(end, pb_config.target_file, len(lines))
+        msg = cli_messages.msg_invalid_target_lines(
+            end, pb_config.target_file, len(lines)
+        )
         click.echo(msg)
         sys.exit()
 
     pb_config.target_lines = list(range(start, end+1))
 
 
+def _validate_jobs():
+    """Make sure at least one process is requested."""
+    if pb_config.jobs < 1:
+        msg = cli_messages.msg_invalid_jobs(pb_config.jobs)
+        click.echo(msg)
+        sys.exit()
+
+
+def _validate_candidate_quota():
+    """Make sure the candidate quota isn't negative. A quota of 0 means no quota."""
+    if pb_config.candidate_quota < 0:
+        msg = cli_messages.msg_invalid_candidate_quota(pb_config.candidate_quota)
+        click.echo(msg)
+        sys.exit()
+
+
 def _validate_git_status():
     """Look for a clean Git status before introducing bugs."""
-    if pb_config.ignore_git_status:
+    # A dry run doesn't modify any files.
+    if pb_config.ignore_git_status or pb_config.dry_run:
         return
 
     _check_git_available()
@@ -172,29 +216,36 @@ def _validate_git_status():
 
 def _check_git_available():
     """Quit with appropriate message if Git not available."""
-    if not shutil.which("git"):
+    # Importing git_utils here keeps subprocess out of startup.
+    from py_bugger.utils import git_utils
+
+    if not git_utils.is_available():
         click.echo(cli_messages.msg_git_not_available)
         sys.exit()
 
 
 def _check_git_status():
-    """Make sure we're starting with a clean git status."""
+    """Make sure we're starting with a clean git status.
+
+    Only the target file or directory needs to be clean.
+    """
+    from py_bugger.utils import git_utils
+
     if pb_config.target_file:
         git_dir = pb_config.target_file.parent
+        pathspec = pb_config.target_file.name
     else:
         git_dir = pb_config.target_dir
+        pathspec = "."
 
-    cmd = "git status --porcelain"
-    cmd_parts = shlex.split(cmd)
-    output = subprocess.run(cmd_parts, cwd=git_dir, capture_output=True, text=True)
-
-    if "fatal: not a git repository" in output.stderr:
+    if not git_utils.get_root(git_dir):
         msg = cli_messages.msg_git_not_used(pb_config)
         click.echo(msg)
         sys.exit()
 
-    # `git status --porcelain` has no output when the status is clean.
-    if output.stdout or output.stderr:
+    # An empty list of entries means the status is clean.
+    entries = git_utils.get_status(git_dir, pathspec, pb_config.untracked_files)
+    if entries is None or entries:
         msg = cli_messages.msg_unclean_git_status
         click.echo(msg)
         sys.exit()
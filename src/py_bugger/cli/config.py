@@ -10,15 +10,32 @@ SUPPORTED_EXCEPTION_TYPES = [
     "IndentationError",
 ]
 
+# Values accepted by `git status --untracked-files`.
+UNTRACKED_FILES_MODES = ["no", "normal", "all"]
+
+# Ways of holding candidates while they're sampled.
+CANDIDATE_STORES = ["reservoir", "columnar"]
+
 
 @dataclass
 class PBConfig:
-    exception_type: str = ""
+    exception_type: tuple = ()
     target_dir: Path = ""
     target_file: Path = ""
     target_lines: str = ""
+    include: tuple = ()
+    exclude: tuple = ()
     num_bugs: int = 1
     ignore_git_status: bool = False
+    untracked_files: str = "normal"
+    jobs: int = 1
+    candidate_quota: int = 0
+    candidate_store: str = "reservoir"
+    dry_run: bool = False
+    patch_file: str = ""
+    profile: bool = False
+    profile_output: str = ""
+    profile_stats: str = ""
     verbose: bool = True
 
 
@@ -1,8 +1,18 @@
 import os
+from pathlib import Path
 import random
+import sys
+import time
 
 from py_bugger import buggers
 from py_bugger.utils import file_utils
+from py_bugger.utils import apply_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.events import events
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.overlay import overlay
+from py_bugger.utils.profiler import profiler
 
 from py_bugger.cli.config import pb_config
 from py_bugger.cli.config import SUPPORTED_EXCEPTION_TYPES
@@ -10,42 +20,100 @@ from py_bugger.cli import cli_messages
 
 
 def main():
+    start = time.perf_counter()
     set_random_seed()
 
     # Get a list of .py files we can consider modifying.
-    py_files = file_utils.get_py_files(pb_config.target_dir, pb_config.target_file)
+    with profiler.phase("discovery"):
+        py_files = file_utils.get_py_files(
+            pb_config.target_dir,
+            pb_config.target_file,
+            include=pb_config.include,
+            exclude=pb_config.exclude,
+        )
+    profiler.count("files_discovered", len(py_files))
+
+    if events.wants("on_file_discovered"):
+        for path in py_files:
+            events.emit("on_file_discovered", path=path)
+
+    # Use the candidate index, if `py-bugger index` has been run for this project.
+    candidate_index.load(pb_config.target_dir)
 
     # Make a list of bugs to introduce.
-    if pb_config.exception_type:
+    if len(pb_config.exception_type) == 1:
         # User has requested a specific kind of bug.
-        requested_bugs = [pb_config.exception_type for _ in range(pb_config.num_bugs)]
+        requested_bugs = [
+            pb_config.exception_type[0] for _ in range(pb_config.num_bugs)
+        ]
     else:
-        # No -e arg passed; get a random sequence of bugs to introduce.
-        # Reorder sequence so all regex parsing happens after CST parsing. CST parsing
-        # will fail if it's attempted after introducing a bug that affects parsing.
-        requested_bugs = random.choices(SUPPORTED_EXCEPTION_TYPES, k=pb_config.num_bugs)
-        requested_bugs = sorted(requested_bugs, key=lambda b: b == "IndentationError")
-
-    # Introduce bugs, one at a time.
-    for bug in requested_bugs:
-        if bug == "ModuleNotFoundError":
-            buggers.module_not_found_bugger(py_files)
-        elif bug == "AttributeError":
-            buggers.attribute_error_bugger(py_files)
-        elif bug == "IndentationError":
-            buggers.indentation_error_bugger(py_files)
-
-    # Show a final success/fail message.
+        # Get a random sequence of bugs to introduce, from the requested types or
+        # from all supported types if no -e arg was passed.
+        exception_types = pb_config.exception_type or SUPPORTED_EXCEPTION_TYPES
+        requested_bugs = random.choices(exception_types, k=pb_config.num_bugs)
+
+    # Plan every bug against the unmodified code. Nothing is modified until all
+    # bugs are planned, so bugs can be planned in any order.
+    with profiler.phase("transform"):
+        buggers.plan_bugs(py_files, requested_bugs)
+
+    # Apply modifications in memory. Then write every modified file once, or show
+    # the changes for a dry run.
+    apply_utils.apply_modifications()
+
+    if pb_config.dry_run or pb_config.patch_file:
+        patch = overlay.get_patch(_get_patch_root())
+        if pb_config.patch_file:
+            Path(pb_config.patch_file).write_bytes(patch)
+
+    if pb_config.dry_run:
+        # The patch file is exact. What's shown only needs to be readable.
+        print(patch.decode(errors="replace"), end="")
+        overlay.clear()
+    else:
+        apply_utils.write_modifications()
+        candidate_index.save()
+
+    events.emit(
+        "on_run_finished",
+        num_added=len(modifications),
+        num_requested=pb_config.num_bugs,
+        elapsed=time.perf_counter() - start,
+    )
+
+    # Show a final success/fail message. In a dry run, keep it out of the patch.
     msg = cli_messages.success_msg()
-    print(msg)
+    print(msg, file=sys.stderr if pb_config.dry_run else sys.stdout)
 
     # Returning requested_bugs helps with testing.
     return requested_bugs
 
 
+def index():
+    """Build or refresh the candidate index for the target directory."""
+    py_files = file_utils.get_py_files(pb_config.target_dir, target_file="")
+    candidate_index.load(pb_config.target_dir, create=True)
+
+    # Collecting every kind of candidate for every file fills the index.
+    kinds = list(candidate_utils.BUG_KINDS.values())
+    candidate_utils.get_candidates(py_files, kinds)
+
+    candidate_index.save()
+
+    msg = cli_messages.msg_index_built(len(py_files), candidate_index.path_cache_dir)
+    print(msg)
+
+
 # --- Helper functions ---
 
 
+def _get_patch_root():
+    """Paths in patches are relative to the target file's directory, or target_dir."""
+    if pb_config.target_file:
+        return pb_config.target_file.parent
+    return pb_config.target_dir
+
+
 def set_random_seed():
     # Set a random seed when testing.
     if seed := os.environ.get("PY_BUGGER_RANDOM_SEED"):
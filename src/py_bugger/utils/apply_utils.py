@@ -0,0 +1,134 @@
+"""Utilities for applying staged modifications to the user's files.
+
+All modifications to a file are applied together. Each one becomes a splice: the
+byte offset where it starts in the original source, the offset where it ends, and
+the code that replaces what's in between. The modified source is rebuilt once from
+the splices and the unchanged bytes between them, and goes to the overlay. Files
+are then written in a single transaction, so a failed run leaves no file modified.
+A dry run never writes them at all.
+"""
+
+import time
+
+from py_bugger.utils import encoding_utils
+from py_bugger.utils import file_utils
+from py_bugger.utils.events import events
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.overlay import overlay
+from py_bugger.utils.profiler import profiler
+
+
+def apply_modifications():
+    """Apply all staged modifications to the overlay."""
+    with profiler.phase("transform"):
+        for path in modifications.paths:
+            overlay.write_bytes(path, get_modified_source(path))
+
+
+def write_modifications():
+    """Write every file in the overlay to disk, once."""
+    start = time.perf_counter()
+    with profiler.phase("write"):
+        file_utils.write_sources(overlay.sources)
+    profiler.count("files_written", len(overlay.sources))
+
+    if events.wants("on_bug_written"):
+        elapsed = time.perf_counter() - start
+        for path in overlay.sources:
+            for modification in modifications.get_path_modifications(path):
+                events.emit(
+                    "on_bug_written",
+                    path=path,
+                    modification=modification,
+                    elapsed=elapsed,
+                )
+
+    overlay.clear()
+
+
+def get_modified_source(path):
+    """Get the source for path, with all of its staged modifications applied.
+
+    Only the lines up to the last modification are indexed, and the source is
+    joined once, so the cost of a file depends mostly on how many modifications it
+    has, not on its size. Everything outside the modified spans is kept byte for
+    byte, including the encoding cookie and line endings.
+    """
+    path_modifications = modifications.get_path_modifications(path)
+    _set_new_line_nums(path_modifications)
+
+    source = overlay.read_bytes(path)
+    encoding = encoding_utils.get_encoding(source)
+    last_line = path_modifications[-1].span[2]
+    line_offsets = _get_line_offsets(source, last_line)
+
+    # Modifications are sorted by span start, and spans never overlap.
+    pieces = []
+    offset = 0
+    splices = _get_splices(source, encoding, line_offsets, path_modifications)
+    for start, end, new_code in splices:
+        pieces += [source[offset:start], new_code]
+        offset = end
+    pieces.append(source[offset:])
+
+    return b"".join(pieces)
+
+
+# --- Helper functions ---
+
+
+def _set_new_line_nums(path_modifications):
+    """Set new_line_num for modifications to one file, sorted by span start."""
+    offset = 0
+    for modification in path_modifications:
+        modification.new_line_num = modification.line_num + offset
+        offset += modification.line_delta
+
+
+def _get_line_offsets(source, num_lines):
+    """Get the offset where each line of source starts.
+
+    Offsets are found for the first num_lines lines, and the line after them if
+    there is one. The rest of source isn't scanned. A BOM isn't part of the first
+    line.
+    """
+    offsets = [encoding_utils.get_bom_length(source)]
+    for match in encoding_utils.LINE_END.finditer(source):
+        if len(offsets) > num_lines:
+            break
+        offsets.append(match.end())
+    return offsets
+
+
+def _get_splices(source, encoding, line_offsets, path_modifications):
+    """Yield (start, end, new code) for each modification to one file."""
+    for modification in path_modifications:
+        line, column, end_line, end_column = modification.span
+
+        if modification.is_line_modification:
+            # Indent the whole line.
+            start, end = _get_line_bounds(source, line_offsets, line)
+            modification.original_line = source[start:end].decode(encoding)
+            modification.modified_line = f"    {modification.original_line}"
+            yield start, start, b"    "
+            continue
+
+        start = _get_offset(source, encoding, line_offsets, line, column)
+        end = _get_offset(source, encoding, line_offsets, end_line, end_column)
+        yield start, end, modification.new_code.encode(encoding)
+
+
+def _get_offset(source, encoding, line_offsets, line, column):
+    """Get the byte offset of a character column in a line."""
+    start, end = _get_line_bounds(source, line_offsets, line)
+    line_source = source[start:end]
+    if line_source.isascii():
+        return start + column
+    return start + len(line_source.decode(encoding)[:column].encode(encoding))
+
+
+def _get_line_bounds(source, line_offsets, line):
+    """Get the offsets where a line starts and ends, including its line ending."""
+    start = line_offsets[line - 1]
+    end = line_offsets[line] if line < len(line_offsets) else len(source)
+    return start, end
@@ -0,0 +1,131 @@
+"""Utilities for finding candidates with the standard library's ast module.
+
+Parsing with ast is much faster than parsing with libcst, and most files are never
+chosen for a bug. Candidates are found with ast, and only a file that's actually
+chosen is parsed with libcst.
+
+Rows found here must match the positions libcst's PositionProvider reports for the
+same nodes, so cst_utils modifiers can find them.
+"""
+
+import ast
+import re
+
+from py_bugger.utils import encoding_utils
+
+
+# Kinds of candidates found by examining the AST, and text that any file with a
+# candidate of that kind must contain.
+AST_KINDS = {
+    "import": b"import",
+    "attribute": b".",
+}
+
+
+class CandidateFinder(ast.NodeVisitor):
+    """Find nodes of every requested kind, in a single pass over the tree."""
+
+    def __init__(self, kinds):
+        self.found_nodes = {kind: [] for kind in kinds}
+
+        # Lists for kinds that weren't requested are None.
+        self.imports = self.found_nodes.get("import")
+        self.attributes = self.found_nodes.get("attribute")
+
+    def visit_Import(self, node):
+        if self.imports is not None:
+            self.imports.append(node)
+
+    def visit_ImportFrom(self, node):
+        # Dotted module names aren't attributes.
+        pass
+
+    def visit_Attribute(self, node):
+        if self.attributes is not None:
+            self.attributes.append(node)
+        self.generic_visit(node)
+
+
+def collect_rows(source, kinds):
+    """Collect rows for all nodes of the given kinds in source, in a single pass.
+
+    Source is bytes; ast decodes it with the encoding the file declares. Source that
+    doesn't contain the text a kind needs isn't parsed for that kind. Source that
+    can't be parsed has no nodes to modify.
+
+    Returns:
+        Dict: {kind: rows}, with rows in the order libcst visits their nodes.
+    """
+    rows = {kind: [] for kind in kinds}
+
+    kinds = [kind for kind in kinds if AST_KINDS[kind] in source]
+    if not kinds:
+        return rows
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return rows
+
+    candidate_finder = CandidateFinder(kinds)
+    candidate_finder.visit(tree)
+
+    # ast columns are UTF-8 byte offsets; libcst columns are character offsets.
+    if source.isascii():
+        lines = None
+    else:
+        lines = re.split(r"\r\n|\r|\n", encoding_utils.decode_source(source))
+
+    for kind, nodes in candidate_finder.found_nodes.items():
+        kind_rows = []
+        for node in nodes:
+            position = _get_position(node, lines)
+            kind_rows.append(position + (_get_name(node, position, lines),))
+
+        # libcst visits nodes in source order, with enclosing nodes first.
+        rows[kind] = sorted(kind_rows, key=lambda r: (r[0], r[1], -r[2], -r[3]))
+
+    return rows
+
+
+# --- Helper functions ---
+
+
+def _get_name(node, position, lines):
+    """Get the identifier a bug would affect in node.
+
+    ast normalizes identifiers with NFKC, so a non-ASCII attribute name can differ
+    from what's written in the source, even in length. The span of an attribute is
+    based on the length of its name, so take the name from the source instead.
+    """
+    if isinstance(node, ast.Import):
+        return node.names[0].name
+
+    if not lines:
+        return node.attr
+
+    # The attribute name is the run of identifier characters that ends the node.
+    end_line, end_column = position[2:]
+    line = lines[end_line - 1]
+    column = end_column
+    while column > 0 and f"a{line[column - 1]}".isidentifier():
+        column -= 1
+
+    return line[column:end_column]
+
+
+def _get_position(node, lines):
+    """Get a (line, column, end_line, end_column) tuple, with character columns."""
+    column, end_column = node.col_offset, node.end_col_offset
+    if lines:
+        column = _get_char_column(lines[node.lineno - 1], column)
+        end_column = _get_char_column(lines[node.end_lineno - 1], end_column)
+
+    return (node.lineno, column, node.end_lineno, end_column)
+
+
+def _get_char_column(line, byte_column):
+    """Convert a UTF-8 byte offset in line to a character offset."""
+    if line.isascii():
+        return byte_column
+    return len(line.encode()[:byte_column].decode())
@@ -3,7 +3,6 @@
 import random
 import builtins
 
-from py_bugger.utils import file_utils
 from py_bugger.utils.modification import Modification, modifications
 
 
@@ -59,64 +58,18 @@ def modify_char(name):
     return "".join(chars)
 
 
-def add_indentation(path, target_line):
-    """Add one level of indentation (four spaces) to line."""
-    indentation_added = False
-
-    lines = path.read_text().splitlines(keepends=True)
-
-    modified_lines = []
-    for line in lines:
-        # `line` contains leading whitespace and trailing newline.
-        # `target_line` just contains code, so use `in` rather than `==`.
-        if target_line in line:
-            modified_line = f"    {line}"
-            modified_lines.append(modified_line)
-            indentation_added = True
-
-            # Record this modification.
-            modification = Modification(
-                path,
-                original_line=line,
-                modified_line=modified_line,
-                exception_induced=IndentationError,
-            )
-            modifications.append(modification)
-        else:
-            modified_lines.append(line)
-
-    modified_source = "".join(modified_lines)
-    path.write_text(modified_source)
-
-    return indentation_added
-
-
-def add_indentation_linenum(path, target_line_num):
-    """Add one level of indentation (four spaces) to line at linenum."""
-    indentation_added = False
-
-    lines = path.read_text().splitlines(keepends=True)
-
-    modified_lines = []
-    for line_num, line in enumerate(lines, start=1):
-        if line_num == target_line_num:
-            modified_line = f"    {line}"
-            modified_lines.append(modified_line)
-            indentation_added = True
-
-            # Record this modification.
-            modification = Modification(
-                path,
-                original_line=line,
-                modified_line=modified_line,
-                exception_induced=IndentationError,
-                line_num=line_num,
-            )
-            modifications.append(modification)
-        else:
-            modified_lines.append(line)
-
-    modified_source = "".join(modified_lines)
-    path.write_text(modified_source)
-
-    return indentation_added
\ No newline at end of file
+def add_indentation(candidate):
+    """Stage one level of indentation (four spaces) for the line a candidate refers to.
+
+    The line is indented when all modifications are applied.
+    """
+    modification = Modification(
+        candidate.path,
+        candidate=candidate,
+        exception_induced=IndentationError,
+        line_num=candidate.line,
+        span=candidate.span,
+    )
+    modifications.append(modification)
+
+    return True
@@ -0,0 +1,55 @@
+"""Model for candidates: places in the user's code where a bug could be introduced.
+
+Candidates are plain tuples, so they're cheap to create, compare, and pickle. Worker
+processes and the candidate index deal in rows, which are candidates without the
+path and kind: (line, column, end_line, end_column, name). The path and kind are
+the same for every row collected from one file for one kind of bug.
+
+Candidates are also what modifications refer to, so nothing outside the parse
+cache keeps a libcst tree alive. Every candidate from one file shares the same
+Path, so a candidate costs about as much as a tuple of seven pointers.
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+
+class Candidate(NamedTuple):
+    path: Path
+
+    # Position of the node, as reported by libcst's PositionProvider. Line numbers
+    # are not zero-indexed, columns are.
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+
+    # The kind of candidate, ie "import", "attribute", or "indentation".
+    kind: str
+
+    # The identifier a bug would affect, ie a module or attribute name.
+    name: str
+
+    @property
+    def position(self):
+        return (self.line, self.column, self.end_line, self.end_column)
+
+    @property
+    def span(self):
+        """The code a bug would change: an attribute name, or a whole line or import."""
+        return get_span(self.kind, *self.position, self.name)
+
+    @classmethod
+    def from_row(cls, path, kind, row):
+        """Build a candidate from a row collected for path."""
+        line, column, end_line, end_column, name = row
+        return cls(path, line, column, end_line, end_column, kind, name)
+
+
+def get_span(kind, line, column, end_line, end_column, name):
+    """Get the span a bug would change, for a candidate of kind at this position."""
+    if kind == "attribute":
+        return (end_line, end_column - len(name), end_line, end_column)
+    if kind == "indentation":
+        return (line, 0, end_line, end_column)
+    return (line, column, end_line, end_column)
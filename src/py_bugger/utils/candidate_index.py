@@ -0,0 +1,312 @@
+"""Persistent index of bug candidates, stored in .py_bugger_cache/.
+
+Every run needs the candidates for each kind of bug in every file: import statements,
+attributes, and lines that can be indented. Finding these means reading and parsing
+the whole project, which is slow for a large project that hasn't changed since the
+last run.
+
+The index stores each file's candidates, keyed by the file's Git blob id. Blob ids
+are computed the same way Git computes them, so non-Git projects work as well. In a
+Git project, the index also remembers which blob each tracked path had at the last
+indexed commit. Paths that `git diff --name-only` doesn't report as changed since
+then are never read or parsed again. Git doesn't report changes to untracked files,
+so they're always looked up by content.
+
+The index is only used when .py_bugger_cache/ exists in the target directory. It's
+created by `py-bugger index`. Candidates for each kind must be a deterministic
+function of a file's contents; bump INDEX_VERSION whenever that changes.
+
+Without the index, candidates aren't kept in memory at all. They're handed to the
+caller as they're collected, so a run only holds the candidates it samples. Files
+modified during the current run are never looked up in, or recorded to, the index.
+Their candidates are always collected from the modified source.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import os
+
+from py_bugger.utils import git_utils
+from py_bugger.utils.git_utils import git_cache
+from py_bugger.utils.profiler import profiler
+
+
+CACHE_DIR_NAME = ".py_bugger_cache"
+INDEX_FILENAME = "candidate_index.json"
+INDEX_VERSION = 6
+
+# Maximum number of files to keep candidates for. Least recently used entries
+# are evicted first.
+MAX_ENTRIES = 50_000
+
+
+@dataclass
+class CandidateIndex:
+    # Only set when the index is in use for this run.
+    path_cache_dir: Path = None
+    root_dir: Path = None
+
+    # Commit the paths map is valid for. Empty for non-Git projects.
+    commit: str = ""
+
+    # Blob id -> {kind: candidates}. Ordered from least to most recently used.
+    entries: dict = field(default_factory=dict)
+
+    # Relative posix path -> blob id, for tracked files known to match commit.
+    paths: dict = field(default_factory=dict)
+
+    # Path -> blob id, for all files looked up during this run.
+    run_keys: dict = field(default_factory=dict)
+
+    # Path -> {kind: candidates}, for files looked up in the index during this run.
+    # These are the same dicts that are stored in entries.
+    run_entries: dict = field(default_factory=dict)
+
+    # Paths that have been modified during this run.
+    modified_paths: set = field(default_factory=set)
+
+    # Paths that differ from HEAD, and shouldn't be recorded in paths.
+    dirty_paths: set = field(default_factory=set)
+
+    @property
+    def in_use(self):
+        return self.path_cache_dir is not None
+
+    def load(self, root_dir, create=False):
+        """Load the index for root_dir, if there is one.
+
+        If create is True, make the cache directory if it doesn't already exist.
+        """
+        self.clear()
+
+        path_cache_dir = root_dir / CACHE_DIR_NAME
+        if create:
+            _make_cache_dir(path_cache_dir)
+        if not path_cache_dir.is_dir():
+            return
+
+        self.path_cache_dir = path_cache_dir
+        self.root_dir = root_dir
+
+        path_index = path_cache_dir / INDEX_FILENAME
+        if path_index.exists():
+            try:
+                data = json.loads(path_index.read_text())
+            except ValueError:
+                # A corrupt index is just a cold cache.
+                data = {}
+
+            if data.get("version") == INDEX_VERSION:
+                self.commit = data["commit"]
+                self.paths = data["paths"]
+                self.entries = {
+                    key: {kind: _from_json(c) for kind, c in entry.items()}
+                    for key, entry in data["entries"].items()
+                }
+
+        self._invalidate_changed_paths()
+
+    def save(self):
+        """Write the index to disk, evicting the least recently used entries."""
+        if not self.in_use:
+            return
+
+        while len(self.entries) > MAX_ENTRIES:
+            key = next(iter(self.entries))
+            del self.entries[key]
+
+        self.paths = {
+            path: key for path, key in self.paths.items() if key in self.entries
+        }
+
+        data = {
+            "version": INDEX_VERSION,
+            "commit": self.commit,
+            "paths": self.paths,
+            "entries": self.entries,
+        }
+
+        # Write to a temp file first, so an interrupted run can't corrupt the index.
+        path_index = self.path_cache_dir / INDEX_FILENAME
+        path_tmp = path_index.with_suffix(".tmp")
+        path_tmp.write_text(json.dumps(data))
+        os.replace(path_tmp, path_index)
+
+    def clear(self):
+        """Forget everything about the current index."""
+        self.path_cache_dir = None
+        self.root_dir = None
+        self.commit = ""
+        self.entries = {}
+        self.paths = {}
+        self.run_keys = {}
+        self.run_entries = {}
+        self.modified_paths = set()
+        self.dirty_paths = set()
+
+    def get_candidates(self, paths, kinds, collect):
+        """Get all candidates of each kind, for each path.
+
+        collect(paths, kinds) is called once for each group of paths that are
+        missing the same kinds. It must return one {kind: candidates} dict for each
+        path it's given.
+
+        Returns:
+            List: One {kind: candidates} dict for each path, in the same order as paths.
+        """
+        entries = [self._get_entry(path) for path in paths]
+
+        # Group paths by the kinds they're missing, so each group is collected in
+        # a single pass.
+        missing = {}
+        for index, entry in enumerate(entries):
+            missing_kinds = tuple(kind for kind in kinds if kind not in entry)
+            if missing_kinds:
+                missing.setdefault(missing_kinds, []).append(index)
+
+        for missing_kinds, indices in missing.items():
+            missing_paths = [paths[index] for index in indices]
+            all_rows = collect(missing_paths, list(missing_kinds))
+            for index, rows in zip(indices, all_rows):
+                entries[index].update(rows)
+
+        return entries
+
+    def invalidate(self, path):
+        """Forget candidates for a file that's been modified during this run."""
+        self.run_entries.pop(path, None)
+        self.modified_paths.add(path)
+
+    # --- Helper methods ---
+
+    def _get_entry(self, path):
+        """Get the {kind: candidates} dict for path.
+
+        When the index is in use, this is the same dict that's stored in the index,
+        so anything collected for it is saved as well. Otherwise it's a new dict,
+        which isn't kept.
+        """
+        if not self.in_use or path in self.modified_paths:
+            return {}
+
+        if path in self.run_entries:
+            return self.run_entries[path]
+
+        key = self._get_key(path)
+
+        # Reinsert the entry, to mark it as most recently used.
+        entry = self.entries.pop(key, {})
+        self.entries[key] = entry
+        profiler.count("index_hits" if entry else "index_misses")
+
+        self.run_entries[path] = entry
+        return entry
+
+    def _get_key(self, path):
+        """Get the blob id for path, without reading it if possible.
+
+        Keys are computed once per run, before the file can be modified.
+        """
+        if path in self.run_keys:
+            return self.run_keys[path]
+
+        rel_path = _get_rel_path(path, self.root_dir)
+        if rel_path in self.paths:
+            key = self.paths[rel_path]
+        else:
+            key = git_utils.get_clean_blob_id(path) or _get_blob_id(path)
+            if self._can_record(path, rel_path):
+                self.paths[rel_path] = key
+
+        self.run_keys[path] = key
+        return key
+
+    def _can_record(self, path, rel_path):
+        """Check if path's blob id can be recorded against the current commit.
+
+        Only files listed by `git ls-files` are recorded. Changes to untracked files
+        never show up in `git diff`, so a recorded blob id for one could go stale.
+        """
+        if not (self.commit and rel_path) or rel_path in self.dirty_paths:
+            return False
+        return path in git_cache.blob_ids
+
+    def _invalidate_changed_paths(self):
+        """Drop paths that have changed since the last indexed commit."""
+        if not git_utils.get_root(self.root_dir):
+            self.commit = ""
+            self.paths = {}
+            return
+
+        head = git_utils.run_git(self.root_dir, ["rev-parse", "HEAD"])
+        if head is None:
+            # No commits yet.
+            self.commit = ""
+            self.paths = {}
+            return
+        head = head.strip()
+
+        changed = None
+        if self.commit:
+            args = ["diff", "--name-only", "--relative", self.commit]
+            changed = git_utils.run_git(self.root_dir, args)
+            if changed is None:
+                # The last indexed commit is gone, eg after a rebase.
+                self.paths = {}
+            else:
+                for rel_path in changed.splitlines():
+                    self.paths.pop(rel_path, None)
+
+        # Files that differ from HEAD can be looked up by content, but shouldn't
+        # be recorded against this commit.
+        if self.root_dir in git_cache.clean_paths:
+            # The Git status check already showed there are no changes.
+            dirty = ""
+        elif self.commit == head and changed is not None:
+            dirty = changed
+        else:
+            args = ["diff", "--name-only", "--relative", "HEAD"]
+            dirty = git_utils.run_git(self.root_dir, args) or ""
+        self.dirty_paths = set(dirty.splitlines())
+
+        self.commit = head
+
+
+# Only make one instance of this index.
+candidate_index = CandidateIndex()
+
+
+# --- Helper functions ---
+
+
+def _make_cache_dir(path_cache_dir):
+    """Make the cache dir, ignoring its contents so Git status stays clean."""
+    path_cache_dir.mkdir(exist_ok=True)
+    path_gitignore = path_cache_dir / ".gitignore"
+    if not path_gitignore.exists():
+        path_gitignore.write_text("# Created by py-bugger.\n*\n")
+
+
+def _get_blob_id(path):
+    """Compute the same id Git uses for the blob of this file's contents."""
+    with profiler.phase("read"):
+        data = path.read_bytes()
+    profiler.count("files_read")
+    profiler.count("bytes_read", len(data))
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def _get_rel_path(path, root_dir):
+    """Get path relative to root_dir, as a posix string. Empty if not in root_dir."""
+    try:
+        return Path(path).relative_to(root_dir).as_posix()
+    except ValueError:
+        return ""
+
+
+def _from_json(candidates):
+    """JSON turns position tuples into lists; turn them back into tuples."""
+    return [tuple(c) if isinstance(c, list) else c for c in candidates]
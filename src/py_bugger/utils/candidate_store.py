@@ -0,0 +1,224 @@
+"""Columnar store for candidates, for --candidate-store columnar.
+
+The default way of sampling visits every candidate, building a Candidate for each
+one, and keeps only the sample. A CandidateStore keeps every candidate of one kind
+in array columns instead: a file id, line, column, end line, and end column for each
+candidate, and its name. Rows are added to the columns as each file is collected,
+and aren't kept anywhere else. A Candidate is only built for the candidates that
+are sampled.
+
+Filtering by --target-lines, and leaving out candidates that overlap staged
+modifications, produce a list of indices into the columns. The overlap check
+compares the columns for each modified file against each modified span, without
+building any Candidates. Indices are sampled with the random module, which is
+seeded from PY_BUGGER_RANDOM_SEED when it's set.
+
+If NumPy is installed, it's used to filter the columns, a whole column at a time.
+NumPy is optional, and the same indices are chosen with or without it, so seeded
+runs are reproducible.
+"""
+
+from array import array
+from itertools import repeat
+import random
+
+from py_bugger.utils.candidate import Candidate, get_span
+from py_bugger.utils.modification import modifications
+
+
+# Positions are packed into one integer, line << POSITION_BITS | column, so comparing
+# packed positions compares (line, column) tuples.
+POSITION_BITS = 32
+
+
+class CandidateStore:
+    """Every candidate of one kind, in columns."""
+
+    def __init__(self, kind):
+        self.kind = kind
+
+        # File id -> path.
+        self.paths = []
+
+        # Path -> file id.
+        self.file_ids = {}
+
+        # Index of the first candidate from each file. Candidates from one file are
+        # stored together, so file id n has the candidates from starts[n] up to
+        # starts[n + 1].
+        self.starts = array("q", [0])
+
+        # One value per candidate, in each column.
+        self.file_id_column = array("q")
+        self.line_column = array("q")
+        self.column_column = array("q")
+        self.end_line_column = array("q")
+        self.end_column_column = array("q")
+        self.names = []
+
+        # Length of each name, for finding attribute spans.
+        self.name_length_column = array("q")
+
+    def add_rows(self, path, rows):
+        """Add the rows collected for one kind from one file."""
+        file_id = len(self.paths)
+        self.paths.append(path)
+        self.file_ids[path] = file_id
+
+        self.file_id_column.extend(repeat(file_id, len(rows)))
+        if rows:
+            lines, columns, end_lines, end_columns, names = zip(*rows)
+            self.line_column.extend(lines)
+            self.column_column.extend(columns)
+            self.end_line_column.extend(end_lines)
+            self.end_column_column.extend(end_columns)
+            self.names.extend(names)
+            self.name_length_column.extend(map(len, names))
+
+        self.starts.append(len(self.names))
+
+    def get_candidate(self, index):
+        return Candidate(
+            self.paths[self.file_id_column[index]],
+            self.line_column[index],
+            self.column_column[index],
+            self.end_line_column[index],
+            self.end_column_column[index],
+            self.kind,
+            self.names[index],
+        )
+
+    def get_indices(self, target_lines=()):
+        """Get the indices of candidates on target_lines, which overlap no modification.
+
+        Returns:
+            Sequence: Indices, in ascending order.
+        """
+        indices = range(len(self))
+        if target_lines:
+            indices = _filter_lines(self.line_column, target_lines)
+
+        if excluded := self._get_modified_indices():
+            indices = _remove_indices(indices, excluded)
+
+        return indices
+
+    def sample(self, k, target_lines=()):
+        """Get a random sample of up to k candidates, in random order."""
+        indices = self.get_indices(target_lines)
+        chosen = random.sample(indices, min(k, len(indices)))
+        return [self.get_candidate(index) for index in chosen]
+
+    def __len__(self):
+        return len(self.names)
+
+    # --- Helper methods ---
+
+    def _get_modified_indices(self):
+        """Get indices of candidates that overlap a staged modification.
+
+        Only candidates from files with modifications are checked.
+        """
+        excluded = []
+        for path in modifications.paths:
+            if (file_id := self.file_ids.get(path)) is None:
+                continue
+
+            start, end = self.starts[file_id], self.starts[file_id + 1]
+            if start == end:
+                continue
+
+            modified_spans = [
+                (_pack(*m.span[:2]), _pack(*m.span[2:]))
+                for m in modifications.get_path_modifications(path)
+            ]
+            excluded += self._get_overlapping(start, end, modified_spans)
+
+        return excluded
+
+    def _get_overlapping(self, start, end, modified_spans):
+        """Get indices from start to end of candidates that overlap modified_spans.
+
+        Spans are computed the same way as Candidate.span, with packed positions.
+        Two spans overlap if each one starts before the other ends.
+        """
+        if np := _get_numpy():
+            lines, columns, end_lines, end_columns, name_lengths = (
+                np.frombuffer(values, dtype=np.int64)[start:end]
+                for values in (
+                    self.line_column,
+                    self.column_column,
+                    self.end_line_column,
+                    self.end_column_column,
+                    self.name_length_column,
+                )
+            )
+            if self.kind == "attribute":
+                span_starts = _pack(end_lines, end_columns - name_lengths)
+            elif self.kind == "indentation":
+                span_starts = _pack(lines, 0)
+            else:
+                span_starts = _pack(lines, columns)
+            span_ends = _pack(end_lines, end_columns)
+
+            overlapping = np.zeros(end - start, dtype=bool)
+            for modified_start, modified_end in modified_spans:
+                overlapping |= (span_starts < modified_end) & (
+                    span_ends > modified_start
+                )
+            return (np.flatnonzero(overlapping) + start).tolist()
+
+        overlapping = []
+        for index in range(start, end):
+            span = get_span(
+                self.kind,
+                self.line_column[index],
+                self.column_column[index],
+                self.end_line_column[index],
+                self.end_column_column[index],
+                self.names[index],
+            )
+            span_start, span_end = _pack(*span[:2]), _pack(*span[2:])
+            if any(
+                span_start < modified_end and span_end > modified_start
+                for modified_start, modified_end in modified_spans
+            ):
+                overlapping.append(index)
+
+        return overlapping
+
+
+# --- Helper functions ---
+
+
+def _get_numpy():
+    """Get the numpy module, or None if it's not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _pack(line, column):
+    """Pack a position into one integer. Works on ints and NumPy arrays."""
+    return (line << POSITION_BITS) | column
+
+
+def _filter_lines(line_column, target_lines):
+    """Get the indices of every value in line_column that's in target_lines."""
+    if np := _get_numpy():
+        lines = np.frombuffer(line_column, dtype=np.int64)
+        return np.flatnonzero(np.isin(lines, list(target_lines))).tolist()
+
+    target_lines = set(target_lines)
+    return [index for index, line in enumerate(line_column) if line in target_lines]
+
+
+def _remove_indices(indices, excluded):
+    """Remove excluded indices from indices, keeping ascending order."""
+    if np := _get_numpy():
+        return np.setdiff1d(np.asarray(indices), excluded, assume_unique=True).tolist()
+
+    excluded = set(excluded)
+    return [index for index in indices if index not in excluded]
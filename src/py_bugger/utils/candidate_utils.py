@@ -0,0 +1,335 @@
+"""Utilities for finding candidates for every kind of bug.
+
+Candidates for all requested kinds of bugs are collected together. Each file is
+read once, and parsed at most once, no matter how many kinds of bugs are requested.
+Files are parsed with ast here; only files chosen for a bug are parsed with libcst.
+
+Buggers don't need every candidate in the project, only a random sample of them.
+sample_candidates_by_kind() visits files in a random order, and keeps at most k
+candidates of each kind at a time. Rows collected from a file are dropped once its
+candidates have been offered to the samples, so memory is bounded by the sample
+sizes, not the size of the project. With pb_config.candidate_quota set, files stop
+being visited once that many candidates of each kind have been seen.
+"""
+
+from contextlib import nullcontext
+from functools import partial
+from itertools import repeat
+import random
+
+from py_bugger.utils import ast_utils
+from py_bugger.utils import encoding_utils
+from py_bugger.utils.candidate import Candidate
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.candidate_store import CandidateStore
+from py_bugger.utils.events import events
+from py_bugger.utils.overlay import overlay
+from py_bugger.utils.profiler import profiler
+
+from py_bugger.cli.config import pb_config
+
+
+# Kind of candidate needed to induce each exception type.
+BUG_KINDS = {
+    "ModuleNotFoundError": "import",
+    "AttributeError": "attribute",
+    "IndentationError": "indentation",
+}
+
+# Lines starting with these keywords open an indented block.
+INDENTATION_TARGETS = [
+    "for",
+    "while",
+    "def",
+    "class",
+    "if",
+    "with",
+    "match",
+    "try",
+]
+
+# Bytes each target line starts with -> target.
+INDENTATION_PREFIXES = {target.encode(): target for target in INDENTATION_TARGETS}
+
+
+def get_candidates(py_files, kinds):
+    """Get all candidates of the given kinds.
+
+    Candidates are read from the candidate index when possible. Files that do need to
+    be examined are spread across pb_config.jobs processes.
+
+    Returns:
+        Dict: {kind: candidates}. Candidates are in the same order for every value
+            of pb_config.jobs.
+    """
+    all_rows = candidate_index.get_candidates(py_files, kinds, collect=_collect_rows)
+
+    candidates = {kind: [] for kind in kinds}
+    for path, rows_by_kind in zip(py_files, all_rows):
+        for kind in kinds:
+            candidates[kind] += _get_file_candidates(path, kind, rows_by_kind)
+
+    return candidates
+
+
+def sample_candidates(py_files, kind, k):
+    """Get a random sample of up to k candidates of one kind.
+
+    Returns:
+        List: Sampled candidates, in random order.
+    """
+    return sample_candidates_by_kind(py_files, {kind: k})[kind]
+
+
+def sample_candidates_by_kind(py_files, sample_sizes):
+    """Get a random sample of candidates for each kind, in a single pass.
+
+    sample_sizes: {kind: k}, the most candidates to sample for each kind.
+
+    Files are visited in a random order, and candidates are kept with reservoir
+    sampling, so only k candidates of each kind are held at a time. Without a
+    candidate quota, every file is visited and each candidate is equally likely to
+    be sampled. With a quota, files stop being visited once that many candidates of
+    each kind have been seen, or k of them if that's more.
+
+    Returns:
+        Dict: {kind: sampled candidates}, with each sample in random order.
+    """
+    with profiler.phase("select"):
+        if pb_config.candidate_store == "columnar":
+            return _sample_columnar(py_files, sample_sizes)
+        return _sample_candidates(py_files, sample_sizes)
+
+
+def collect_rows(path, kinds):
+    """Collect rows for every requested kind of candidate in path.
+
+    This is called in worker processes when pb_config.jobs > 1, so it only returns
+    plain tuples, never AST nodes.
+
+    Returns:
+        Dict: {kind: rows}
+    """
+    source = overlay.read_bytes(path)
+    rows = {}
+
+    if "indentation" in kinds:
+        rows["indentation"] = _collect_indentation_rows(source)
+
+    ast_kinds = [kind for kind in kinds if kind in ast_utils.AST_KINDS]
+    if ast_kinds:
+        rows.update(ast_utils.collect_rows(source, ast_kinds))
+
+    return rows
+
+
+# --- Helper functions ---
+
+
+def _sample_candidates(py_files, sample_sizes):
+    """Sample candidates, as described in sample_candidates_by_kind()."""
+    kinds = list(sample_sizes)
+
+    # Sort first, so seeded runs visit files in the same order on every platform.
+    paths = sorted(py_files)
+    random.shuffle(paths)
+
+    reservoirs = {kind: [] for kind in kinds}
+    num_seen = dict.fromkeys(kinds, 0)
+    emit_candidates = events.wants("on_candidate")
+    for path, rows_by_kind in _iter_file_rows(paths, kinds):
+        for kind, reservoir in reservoirs.items():
+            k = sample_sizes[kind]
+            for candidate in _get_file_candidates(path, kind, rows_by_kind):
+                if emit_candidates:
+                    events.emit(
+                        "on_candidate", path=candidate.path, candidate=candidate
+                    )
+
+                num_seen[kind] += 1
+                if len(reservoir) < k:
+                    reservoir.append(candidate)
+                elif (index := random.randrange(num_seen[kind])) < k:
+                    reservoir[index] = candidate
+
+        if _quota_met(num_seen, sample_sizes):
+            break
+
+    for reservoir in reservoirs.values():
+        random.shuffle(reservoir)
+    return reservoirs
+
+
+def _sample_columnar(py_files, sample_sizes):
+    """Sample candidates from columnar stores. See candidate_store.py.
+
+    Without a quota, every file is collected and files don't need to be visited in
+    a random order.
+    """
+    kinds = list(sample_sizes)
+    paths = sorted(py_files)
+    if pb_config.candidate_quota:
+        random.shuffle(paths)
+
+    stores = {kind: CandidateStore(kind) for kind in kinds}
+    for path, rows_by_kind in _iter_file_rows(paths, kinds):
+        for kind, store in stores.items():
+            store.add_rows(path, rows_by_kind[kind])
+
+        num_seen = {kind: len(store) for kind, store in stores.items()}
+        if _quota_met(num_seen, sample_sizes):
+            break
+
+    if events.wants("on_candidate"):
+        for store in stores.values():
+            for index in store.get_indices(pb_config.target_lines):
+                candidate = store.get_candidate(index)
+                events.emit("on_candidate", path=candidate.path, candidate=candidate)
+
+    return {
+        kind: store.sample(sample_sizes[kind], pb_config.target_lines)
+        for kind, store in stores.items()
+    }
+
+
+def _quota_met(num_seen, sample_sizes):
+    """Check if enough candidates of each kind have been seen to stop visiting files.
+
+    A kind's quota is never less than its sample size. Otherwise a sample cut short
+    by the quota would look like every candidate there is.
+    """
+    if not pb_config.candidate_quota:
+        return False
+    return all(
+        num_seen[kind] >= max(pb_config.candidate_quota, k)
+        for kind, k in sample_sizes.items()
+    )
+
+
+def _iter_file_rows(paths, kinds):
+    """Yield (path, {kind: rows}) for each path, collecting files in batches.
+
+    Only one batch of rows is held at a time. In a single process, that's one file.
+    Otherwise each process gets a few files at a time, or a few dozen without a quota,
+    and the same worker processes are used for every batch. The caller can stop
+    early, and the remaining batches are never collected.
+    """
+    if pb_config.jobs < 2:
+        batch_size = 1
+    elif pb_config.candidate_quota:
+        batch_size = pb_config.jobs * 4
+    else:
+        batch_size = pb_config.jobs * 64
+
+    with _get_executor() as executor:
+        collect = partial(_collect_rows, executor=executor)
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start : start + batch_size]
+            all_rows = candidate_index.get_candidates(batch, kinds, collect=collect)
+            yield from zip(batch, all_rows)
+
+
+def _get_file_candidates(path, kind, rows_by_kind):
+    """Build candidates of one kind for path, keeping only targeted lines."""
+    candidates = [Candidate.from_row(path, kind, row) for row in rows_by_kind[kind]]
+    if pb_config.target_lines:
+        candidates = [c for c in candidates if c.line in pb_config.target_lines]
+    return candidates
+
+
+def _collect_rows(paths, kinds, executor=None):
+    """Collect rows for every path, in parallel if requested.
+
+    Returns:
+        List: One {kind: rows} dict for each path, in the same order as paths.
+    """
+    with profiler.phase("collect"):
+        all_rows = _run_collect_rows(paths, kinds, executor)
+
+    if profiler.enabled:
+        profiler.count("files_scanned", len(paths))
+        for rows in all_rows:
+            for kind, kind_rows in rows.items():
+                profiler.count(f"candidates_{kind}", len(kind_rows))
+
+    return all_rows
+
+
+def _run_collect_rows(paths, kinds, executor=None):
+    """Collect rows for every path, in worker processes when pb_config.jobs > 1.
+
+    Workers come from executor, or from a new executor for just these paths.
+    """
+    if pb_config.jobs < 2 or len(paths) < 2:
+        return [collect_rows(path, kinds) for path in paths]
+
+    if executor is None:
+        with _get_executor() as executor:
+            return _run_collect_rows(paths, kinds, executor)
+
+    # Send paths to workers in chunks, so there's a few chunks per worker.
+    chunksize = max(1, len(paths) // (pb_config.jobs * 4))
+
+    # map() returns results in the order paths were submitted.
+    if not profiler.enabled:
+        all_rows = executor.map(collect_rows, paths, repeat(kinds), chunksize=chunksize)
+        return list(all_rows)
+
+    results = executor.map(
+        _collect_rows_with_counters, paths, repeat(kinds), chunksize=chunksize
+    )
+    all_rows = []
+    for rows, counters in results:
+        profiler.add_counters(counters)
+        all_rows.append(rows)
+    return all_rows
+
+
+def _collect_rows_with_counters(path, kinds):
+    """Collect rows in a worker process, along with the counters recorded doing so.
+
+    A worker's profiler isn't the parent's, so its counters are sent back with the
+    rows. Profiling is only requested in the parent, so it's enabled here.
+    """
+    profiler.enable()
+    rows = collect_rows(path, kinds)
+    return rows, profiler.counters
+
+
+def _get_executor():
+    """Get a pool of pb_config.jobs worker processes, or a null context for one job.
+
+    Worker processes are only started once work is submitted.
+    """
+    if pb_config.jobs < 2:
+        return nullcontext()
+
+    # Importing this here keeps multiprocessing out of single-process runs.
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=pb_config.jobs)
+
+
+def _collect_indentation_rows(source):
+    """Collect rows for all lines in source that open an indented block.
+
+    Source is bytes, split only where Python ends a line. A BOM isn't part of the
+    first line. Columns are characters, so lines that aren't ASCII are decoded to
+    find their length.
+    """
+    rows = []
+    encoding = None
+    lines = source[encoding_utils.get_bom_length(source) :].splitlines()
+    for line_num, line in enumerate(lines, start=1):
+        stripped_line = line.strip()
+        for prefix, target in INDENTATION_PREFIXES.items():
+            if stripped_line.startswith(prefix):
+                indent = len(line) - len(line.lstrip())
+                line = line.rstrip()
+                if not line.isascii():
+                    encoding = encoding or encoding_utils.get_encoding(source)
+                    line = line.decode(encoding, errors="replace")
+                rows.append((line_num, indent, line_num, len(line), target))
+                break
+
+    return rows
@@ -1,12 +1,17 @@
 """Utilities for working with the CST."""
 
 import libcst as cst
-from libcst.metadata import MetadataWrapper, PositionProvider
 
 from py_bugger.utils import bug_utils
 from py_bugger.utils.modification import Modification, modifications
+from py_bugger.utils.overlay import overlay
 
-from py_bugger.cli.config import pb_config
+
+# Nodes whose positions cover all of their children. Modifiers skip these when
+# they can't contain the node to modify. Decorators fall outside the position of a
+# function or class, and a block's position starts after the decorators of its
+# first statement, so compound statements and blocks aren't included.
+SKIPPABLE_NODES = (cst.SimpleStatementLine,)
 
 
 class NodeCollector(cst.CSTVisitor):
@@ -23,150 +28,108 @@ class NodeCollector(cst.CSTVisitor):
         return True
 
 
-class NodeCounter(cst.CSTVisitor):
-    """Count all nodes matching the target node."""
-
-    def __init__(self, target_node):
-        self.target_node = target_node
-        self.node_count = 0
-
-    def on_visit(self, node):
-        """Increment node_count if node matches.."""
-        if node.deep_equals(self.target_node):
-            self.node_count += 1
-        return True
-
+class CandidateModifier(cst.CSTVisitor):
+    """Base class for modifying the node a candidate refers to.
 
-class ImportModifier(cst.CSTTransformer):
-    """Modify imports in the user's project.
+    Modifiers don't change the tree. They stage a modification, which is applied
+    along with every other modification to the same file when the run is finished.
 
-    Note: Each import should be unique, so there shouldn't be any need to track
-    whether a bug was introduced. node_to_break should only match one node in the
-    tree.
+    Nodes are matched by position, not by structure, so each check is O(1). Simple
+    statement lines that can't contain the candidate aren't visited at all.
     """
 
-    def __init__(self, node_to_break, path, metadata):
-        self.node_to_break = node_to_break
-
-        # Need this to record the modification we're making.
-        self.path = path
+    def __init__(self, candidate, metadata):
+        self.candidate = candidate
         self.metadata = metadata
 
-    def leave_Import(self, original_node, updated_node):
-        """Modify a direct `import <package>` statement."""
-        names = updated_node.names
-
-        if original_node.deep_equals(self.node_to_break):
-            original_name = names[0].name.value
+        # Each use of a modifier should only generate one bug.
+        self.bug_generated = False
 
-            # Add a typo to the name of the module being imported.
-            new_name = bug_utils.make_typo(original_name)
+    def on_visit(self, node):
+        """Skip nodes that can't contain the candidate."""
+        if self.bug_generated:
+            return False
+
+        if isinstance(node, SKIPPABLE_NODES) and not self.contains_candidate(node):
+            return False
+
+        return super().on_visit(node)
+
+    def is_candidate(self, node):
+        return _get_position(self.metadata[node]) == self.candidate.position
+
+    def contains_candidate(self, node):
+        position = _get_position(self.metadata[node])
+        start, end = position[:2], position[2:]
+        return (
+            start <= self.candidate.position[:2] and end >= self.candidate.position[2:]
+        )
+
+    def record_modification(self, new_code, exception_induced, line_delta=0):
+        """Stage the modification. new_code replaces the candidate's span."""
+        modification = Modification(
+            path=self.candidate.path,
+            candidate=self.candidate,
+            line_num=self.candidate.line,
+            span=self.candidate.span,
+            new_code=new_code,
+            line_delta=line_delta,
+            exception_induced=exception_induced,
+        )
+        modifications.append(modification)
+        self.bug_generated = True
+
+
+class ImportModifier(CandidateModifier):
+    """Modify imports in the user's project."""
+
+    def visit_Import(self, node):
+        """Modify a direct `import <package>` statement."""
+        if not self.is_candidate(node):
+            return False
 
-            # Modify the node name.
-            new_names = [cst.ImportAlias(name=cst.Name(new_name))]
+        names = node.names
+        original_name = names[0].name.value
 
-            # Record this modification.
-            modified_node = updated_node.with_changes(names=new_names)
+        # Add a typo to the name of the module being imported.
+        new_name = bug_utils.make_typo(original_name)
 
-            position = self.metadata[original_node]
-            line_num = position.start.line
+        # Modify the node name.
+        new_names = [cst.ImportAlias(name=cst.Name(new_name))]
+        modified_node = node.with_changes(names=new_names)
 
-            modification = Modification(
-                path=self.path,
-                original_node=original_node,
-                modified_node=modified_node,
-                line_num=line_num,
-                exception_induced=ModuleNotFoundError,
-            )
-            modifications.append(modification)
+        # The import's span doesn't include a trailing semicolon, so neither does
+        # the code that replaces it.
+        new_code = cst.Module(body=[]).code_for_node(
+            modified_node.with_changes(semicolon=cst.MaybeSentinel.DEFAULT)
+        )
 
-            return updated_node.with_changes(names=new_names)
+        # Record this modification. An import split over several lines is joined
+        # into one line, which moves every line after it.
+        c = self.candidate
+        line_delta = new_code.count("\n") - (c.end_line - c.line)
+        self.record_modification(new_code, ModuleNotFoundError, line_delta)
 
-        return updated_node
+        return False
 
 
-class AttributeModifier(cst.CSTTransformer):
+class AttributeModifier(CandidateModifier):
     """Modify attributes in the user's project."""
 
-    def __init__(self, node_to_break, node_index, path, metadata):
-        self.node_to_break = node_to_break
-
-        # There may be identical nodes in the tree. node_index determines which to modify.
-        self.node_index = node_index
-        self.identical_nodes_visited = 0
-
-        # Each use of this class should only generate one bug. But multiple nodes
-        # can match node_to_break, so make sure we only modify one node.
-        self.bug_generated = False
-
-        # Need this to record the modification we're making.
-        self.path = path
-        self.metadata = metadata
-
-    def leave_Attribute(self, original_node, updated_node):
+    def visit_Attribute(self, node):
         """Modify an attribute name, to generate AttributeError."""
-        attr = updated_node.attr
-
-        if original_node.deep_equals(self.node_to_break) and not self.bug_generated:
-            # If there are identical nodes and this isn't the right one, bump count
-            # and return unmodified node.
-            if self.identical_nodes_visited != self.node_index:
-                self.identical_nodes_visited += 1
-                return updated_node
-
-            original_identifier = attr.value
-
-            # Add a typo to the attribute name.
-            new_identifier = bug_utils.make_typo(original_identifier)
-
-            # Modify the node name.
-            new_attr = cst.Name(new_identifier)
-
-            # Record this modification.
-            modified_node = updated_node.with_changes(attr=new_attr)
-
-            position = self.metadata[original_node]
-            line_num = position.start.line
+        if not self.is_candidate(node):
+            return True
 
-            modification = Modification(
-                path=self.path,
-                original_node=original_node,
-                modified_node=modified_node,
-                line_num=line_num,
-                exception_induced=AttributeError,
-            )
-            modifications.append(modification)
+        original_identifier = node.attr.value
 
-            self.bug_generated = True
+        # Add a typo to the attribute name.
+        new_identifier = bug_utils.make_typo(original_identifier)
 
-            return updated_node.with_changes(attr=new_attr)
+        # Record this modification. The candidate's span is just the attribute name.
+        self.record_modification(new_identifier, AttributeError)
 
-        return updated_node
-
-
-def get_paths_nodes(py_files, node_type):
-    """Get all nodes of given type."""
-    paths_nodes = []
-    for path in py_files:
-        source = path.read_text()
-        tree = cst.parse_module(source)
-
-        wrapper = MetadataWrapper(tree)
-        metadata = wrapper.resolve(PositionProvider)
-
-        node_collector = NodeCollector(node_type=node_type)
-        wrapper.module.visit(node_collector)
-
-        for node in node_collector.collected_nodes:
-            position = metadata.get(node)
-            line_num = position.start.line
-
-            if not pb_config.target_lines:
-                paths_nodes.append((path, node))
-            elif line_num in pb_config.target_lines:
-                paths_nodes.append((path, node))
-
-    return paths_nodes
+        return False
 
 
 def get_all_nodes(path):
@@ -178,7 +141,7 @@ def get_all_nodes(path):
     Example usage, from a #_bugger() function:
         nodes = _get_all_nodes(py_files[0])
     """
-    source = path.read_text()
+    source = overlay.read_bytes(path)
     tree = cst.parse_module(source)
 
     node_collector = NodeCollector(node_type=cst.CSTNode)
@@ -187,13 +150,10 @@ def get_all_nodes(path):
     return node_collector.collected_nodes
 
 
-def count_nodes(tree, node):
-    """Count the number of nodes in path that match node.
+# --- Helper functions ---
 
-    Useful when a file has multiple identical nodes, and we want to choose one.
-    """
-    # Count all relevant nodes.
-    node_counter = NodeCounter(node)
-    tree.visit(node_counter)
 
-    return node_counter.node_count
+def _get_position(code_range):
+    """Convert a CodeRange to a (line, column, end_line, end_column) tuple."""
+    start, end = code_range.start, code_range.end
+    return (start.line, start.column, end.line, end.column)
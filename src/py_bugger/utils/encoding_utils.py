@@ -0,0 +1,45 @@
+"""Utilities for working with source code as bytes.
+
+Source is read, parsed, and written as bytes, so files are never transcoded and
+their newlines are never translated. Code that needs text decodes only what it
+needs, with the encoding Python itself would use for the file: the one declared by
+a BOM or a PEP 263 encoding cookie, or UTF-8.
+"""
+
+import codecs
+from io import BytesIO
+import re
+
+
+# Line endings Python recognizes in source code.
+LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+def get_encoding(source):
+    """Get the encoding of source, as Python would detect it.
+
+    A BOM isn't part of any line, so "utf-8-sig" is returned as "utf-8". Use
+    get_bom_length() to skip past it.
+    """
+    # Importing tokenize here keeps it out of runs that never need it.
+    import tokenize
+
+    try:
+        encoding, _ = tokenize.detect_encoding(BytesIO(source).readline)
+    except SyntaxError:
+        # An unknown encoding. Parsing this file will fail, so any encoding will do.
+        return "utf-8"
+
+    return "utf-8" if encoding == "utf-8-sig" else encoding
+
+
+def get_bom_length(source):
+    return len(codecs.BOM_UTF8) if source.startswith(codecs.BOM_UTF8) else 0
+
+
+def decode_source(source):
+    """Decode source to text, without translating newlines."""
+    text = source[get_bom_length(source) :]
+    if text.isascii():
+        return text.decode("ascii")
+    return text.decode(get_encoding(source), errors="replace")
@@ -0,0 +1,91 @@
+"""Events for observing a run, for code that embeds py-bugger.
+
+Subscribe a callback to an event, then run py-bugger:
+
+    from py_bugger.utils.events import events
+
+    events.subscribe("on_bug_planned", lambda event: print(event.modification))
+
+Each callback is called with an Event. Events, and the payload each one sets:
+- on_file_discovered: path, for each file that can be modified;
+- on_file_parsed: path, and elapsed time to parse it with libcst;
+- on_candidate: candidate, for each place a bug could be introduced that's sampled;
+- on_bug_planned: path, candidate, modification, and elapsed time to plan the bug;
+- on_bug_written: path, modification, and elapsed time for the whole write;
+- on_run_finished: num_added, num_requested, and elapsed time for the run.
+
+Nothing is built or timed for an event that has no subscribers. Hot code checks
+`events.wants(name)` first, or tests `name in events.active` in a loop.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+EVENT_NAMES = [
+    "on_file_discovered",
+    "on_file_parsed",
+    "on_candidate",
+    "on_bug_planned",
+    "on_bug_written",
+    "on_run_finished",
+]
+
+
+@dataclass
+class Event:
+    name: str
+    path: Path = None
+    candidate: Any = None
+    modification: Any = None
+
+    # Seconds spent on whatever the event reports.
+    elapsed: float = 0.0
+
+    num_added: int = 0
+    num_requested: int = 0
+
+
+@dataclass
+class EventHooks:
+    # Event name -> callbacks, in the order they were subscribed.
+    subscribers: dict = field(default_factory=dict)
+
+    # Names of events with at least one subscriber.
+    active: frozenset = frozenset()
+
+    def subscribe(self, name, callback):
+        """Call callback with an Event each time the named event happens."""
+        if name not in EVENT_NAMES:
+            raise ValueError(f"Unknown event: {name}. Events: {', '.join(EVENT_NAMES)}")
+        self.subscribers.setdefault(name, []).append(callback)
+        self.active = frozenset(self.subscribers)
+
+    def unsubscribe(self, name, callback):
+        callbacks = self.subscribers.get(name, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self.subscribers.pop(name, None)
+        self.active = frozenset(self.subscribers)
+
+    def clear(self):
+        self.subscribers = {}
+        self.active = frozenset()
+
+    def wants(self, name):
+        return name in self.active
+
+    def emit(self, name, **payload):
+        """Call every subscriber to the named event."""
+        if name not in self.active:
+            return
+
+        event = Event(name, **payload)
+        for callback in self.subscribers[name]:
+            callback(event)
+
+
+# Only make one instance of the event hooks.
+events = EventHooks()
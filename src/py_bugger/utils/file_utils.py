@@ -1,136 +1,198 @@
 """Utilities for working with the target project's files and directories."""
 
-import subprocess
-import shlex
-from pathlib import Path
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
+from py_bugger.utils import git_utils
+from py_bugger.utils import parse_cache
+from py_bugger.utils import path_matcher
 from py_bugger.utils.modification import modifications
-
-from py_bugger.cli.config import pb_config
+from py_bugger.utils.candidate_index import candidate_index
 
 
 # --- Public functions ---
 
 
-def get_py_files(target_dir, target_file):
-    """Get all the .py files we can consider modifying when introducing bugs."""
+def get_py_files(target_dir, target_file, include=(), exclude=()):
+    """Get all the .py files we can consider modifying when introducing bugs.
+
+    include and exclude are .gitignore-style patterns, relative to target_dir.
+    """
     # Check if user requested a single target file.
     if target_file:
         return [target_file]
 
-    # Use .gitignore if possible.
-    path_git = target_dir / ".git"
-    if path_git.exists():
-        return _get_py_files_git(target_dir)
-    else:
-        return _get_py_files_non_git(target_dir)
+    # Let Git list files if possible, even when targeting a subdirectory of a repo.
+    # Git lists nothing in an untracked or ignored directory, so walk that instead.
+    if git_utils.get_root(target_dir):
+        matcher = path_matcher.get_path_matcher(target_dir, include, exclude, git=True)
+        if py_files := _get_py_files_git(target_dir, matcher):
+            return py_files
+
+    matcher = path_matcher.get_path_matcher(target_dir, include, exclude)
+    return _get_py_files_non_git(target_dir, matcher)
+
 
+def write_sources(sources):
+    """Write new source for several files, as a single transaction.
 
-def get_paths_linenums(py_files, targets):
-    """Get all line numbers from all files matching targets, if they haven't already
-    been modified.
+    Each file is written to a temp file next to it, and all temp files are fsynced
+    together. Then each temp file replaces its original with os.replace(), which is
+    atomic. If anything fails, every original that was already replaced is restored,
+    and the exception is raised again.
+
+    sources: {path: source}, with each source as bytes.
+
+    A symlinked file is written through the link, so the file it points to is
+    modified and the link stays in place.
     """
-    paths_linenums = []
-    for path in py_files:
-        # Get lines and line numbers, and remove lines that have already been modified.
-        lines = path.read_text().splitlines()
-        linenums_lines = enumerate(lines, start=1)
-        linenums_lines = _remove_modified_lines(path, linenums_lines)
-
-        # Only keep line numbers for lines that match targets.
-        # Also, filter for --target-lines if that was passed.
-        for line_num, line in linenums_lines:
-            stripped_line = line.strip()
-            if any([stripped_line.startswith(target) for target in targets]):
-                if not pb_config.target_lines:
-                    paths_linenums.append((path, line_num))
-                elif line_num in pb_config.target_lines:
-                    paths_linenums.append((path, line_num))
-
-    return paths_linenums
-
-
-def check_unmodified(candidate_path, candidate_node=None, candidate_line=None):
-    """Check if it's safe to modify a node or line.
-
-    If the node or line has not already been modified, return True. Otherwise,
-    return False.
+    # Write to the files that symlinks point to. Caches are keyed by the paths files
+    # were read from, so keep those as well.
+    read_paths = list(sources)
+    sources = {path.resolve(): source for path, source in sources.items()}
+    originals = {path: path.read_bytes() for path in sources}
+    replaced_paths = []
+
+    try:
+        with ThreadPoolExecutor() as executor:
+            # Consume results, so exceptions from worker threads are raised here.
+            list(executor.map(_write_tmp_file, sources.keys(), sources.values()))
+            list(executor.map(_fsync_file, map(_get_tmp_path, sources)))
+
+        for path in sources:
+            os.replace(_get_tmp_path(path), path)
+            replaced_paths.append(path)
+    except BaseException:
+        for path in replaced_paths:
+            _write_tmp_file(path, originals[path])
+            os.replace(_get_tmp_path(path), path)
+        raise
+    finally:
+        for path in sources:
+            _get_tmp_path(path).unlink(missing_ok=True)
+
+    for dir_path in {path.parent for path in sources}:
+        _fsync_dir(dir_path)
+
+    # Forget anything cached about the original files.
+    for path in read_paths:
+        parse_cache.invalidate(path)
+        candidate_index.invalidate(path)
+
+
+def check_unmodified(candidate):
+    """Check if it's safe to modify a candidate.
+
+    If none of the code a bug would change for this candidate has already been
+    modified, return True. Otherwise, return False.
     """
-    # Only look at modifications in the candidate path.
-    relevant_modifications = [m for m in modifications if m.path == candidate_path]
+    return not modifications.overlaps(candidate.path, candidate.span)
 
-    if not relevant_modifications:
-        return True
 
-    modified_nodes = [m.modified_node for m in relevant_modifications]
-    modified_lines = [m.modified_line for m in relevant_modifications]
+# --- Helper functions ---
 
-    # Need to use deep_equals for node comparisons.
-    for modified_node in modified_nodes:
-        if modified_node.deep_equals(candidate_node):
-            return False
 
-    if candidate_line in modified_lines:
-        return False
+def _get_tmp_path(path):
+    """Temp file to write path's new source to, in the same directory."""
+    return path.with_name(f".{path.name}.py-bugger-tmp")
 
-    # The candidate node or line has not been modified during this run of py-bugger.
-    return True
 
+def _write_tmp_file(path, data):
+    """Write data to path's temp file, with the same permissions as path."""
+    path_tmp = _get_tmp_path(path)
+    with open(path_tmp, "wb") as f:
+        f.write(data)
+    shutil.copymode(path, path_tmp)
 
-# --- Helper functions ---
+
+def _fsync_file(path):
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
 
 
-def _get_py_files_git(target_dir):
-    """Get all relevant .py files from a directory managed by Git."""
-    cmd = f'git -C {target_dir.as_posix()} ls-files "*.py"'
-    cmd_parts = shlex.split(cmd)
-    output = subprocess.run(cmd_parts, capture_output=True)
-    py_files = output.stdout.decode().strip().splitlines()
+def _fsync_dir(dir_path):
+    """Make renames in dir_path durable. Not possible on all platforms."""
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-    # Convert to path objects. Filter out any test-related files.
-    py_files = [Path(f) for f in py_files]
-    py_files = [pf for pf in py_files if "tests/" not in pf.as_posix()]
-    py_files = [pf for pf in py_files if "Tests/" not in pf.as_posix()]
-    py_files = [pf for pf in py_files if "test_code/" not in pf.as_posix()]
-    py_files = [pf for pf in py_files if pf.name != "conftest.py"]
-    py_files = [pf for pf in py_files if not pf.name.startswith("test_")]
+
+def _get_py_files_git(target_dir, matcher):
+    """Get all relevant .py files from a directory managed by Git.
+
+    Running from target_dir scopes `git ls-files` to target_dir, and lists paths
+    relative to it. Default exclusions are passed to Git as pathspecs, unless a user
+    pattern may re-include some of those files.
+    """
+    if matcher.overrides_defaults:
+        pathspecs = path_matcher.GIT_PATHSPECS[:1]
+    else:
+        pathspecs = path_matcher.GIT_PATHSPECS
+
+    py_files = git_utils.ls_files(target_dir, pathspecs)
+
+    if matcher.has_user_patterns:
+        py_files = [pf for pf in py_files if not matcher.is_excluded(pf)]
 
     # Build full paths.
-    py_files = [target_dir / pf for pf in py_files]
+    return [target_dir / pf for pf in py_files]
 
-    return py_files
 
+def _get_py_files_non_git(target_dir, matcher=None):
+    """Get all relevant .py files from a directory not managed by Git.
 
-def _get_py_files_non_git(target_dir):
-    """Get all relevant .py files from a directory not managed by Git."""
-    py_files = target_dir.rglob("*.py")
-
-    exclude_dirs = [
-        ".venv/",
-        "venv/",
-        "tests/",
-        "Tests/",
-        "test_code/",
-        "build/",
-        "dist/",
-    ]
-    py_files = [
-        pf
-        for pf in py_files
-        if not any(ex_dir in pf.as_posix() for ex_dir in exclude_dirs)
-    ]
-    py_files = [pf for pf in py_files if pf.name != "conftest.py"]
-    py_files = [pf for pf in py_files if not pf.name.startswith("test_")]
+    Excluded directories are pruned before they're visited, so a large virtual
+    environment costs one directory entry rather than a full walk. Each directory's
+    .gitignore applies to everything in it.
+    """
+    if matcher is None:
+        matcher = path_matcher.get_path_matcher(target_dir)
+
+    py_files = []
+
+    # Each entry is a dir to visit, its path relative to target_dir, and the matcher
+    # that applies to it.
+    dirs = [(target_dir, "", matcher)]
+    while dirs:
+        current_dir, rel_dir, matcher = dirs.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+
+        if any(entry.name == ".gitignore" for entry in entries):
+            matcher = _add_gitignore(matcher, current_dir / ".gitignore", rel_dir)
+
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                # Don't follow symlinked dirs, which can lead to cycles.
+                if entry.is_dir(follow_symlinks=False):
+                    if not matcher.is_excluded(rel_path, is_dir=True):
+                        dirs.append((current_dir / entry.name, rel_path, matcher))
+                elif entry.name.endswith(".py") and entry.is_file():
+                    if not matcher.is_excluded(rel_path):
+                        py_files.append(current_dir / entry.name)
+            except OSError:
+                continue
 
     return py_files
 
-def _remove_modified_lines(path, linenums_lines):
-    """Remove lines that have already been modified."""
-    for modification in modifications:
-        if modification.path != path:
-            continue
-        if modification.line_num:
-            linenums_lines = [(line_num, line) for line_num, line in linenums_lines if line_num != modification.line_num]
 
-    return linenums_lines
\ No newline at end of file
+def _add_gitignore(matcher, path_gitignore, rel_dir):
+    """Extend matcher with the patterns in a .gitignore file."""
+    try:
+        lines = path_gitignore.read_text().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return matcher
+    return matcher.with_gitignore(lines, rel_dir)
@@ -0,0 +1,147 @@
+"""All access to Git goes through this module.
+
+Results are cached for the rest of the run, so validation and discovery don't run
+the same command twice. Status checks and file listings are scoped to the target
+file or directory, rather than the whole repo.
+
+Blob ids from `git ls-files` are kept as well. When a scoped status check has shown
+that a file matches the index, its blob id identifies its contents, so the file
+doesn't need to be read and hashed to be looked up in the candidate index.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import shutil
+import subprocess
+
+from py_bugger.utils.profiler import profiler
+
+
+@dataclass
+class GitCache:
+    # Dir -> repo root, or None if dir isn't in a repo.
+    roots: dict = field(default_factory=dict)
+
+    # (dir, pathspec, untracked_files) -> status entries.
+    statuses: dict = field(default_factory=dict)
+
+    # Dirs and files that a status check has shown to be clean.
+    clean_paths: set = field(default_factory=set)
+
+    # Path -> blob id, for every file listed by `git ls-files`.
+    blob_ids: dict = field(default_factory=dict)
+
+    def clear(self):
+        self.roots = {}
+        self.statuses = {}
+        self.clean_paths = set()
+        self.blob_ids = {}
+
+
+# Only make one instance of the cache.
+git_cache = GitCache()
+
+
+def is_available():
+    return shutil.which("git") is not None
+
+
+def run_git(git_dir, args, text=True):
+    """Run a git command in git_dir. Return stdout, or None on failure."""
+    cmd_parts = ["git", "-C", Path(git_dir).as_posix()] + args
+    with profiler.phase("git"):
+        output = subprocess.run(cmd_parts, capture_output=True, text=text)
+    profiler.count("git_commands")
+    if output.returncode != 0:
+        return None
+    return output.stdout
+
+
+def get_root(git_dir):
+    """Get the root of the repo containing git_dir, or None."""
+    git_dir = Path(git_dir)
+    if git_dir not in git_cache.roots:
+        root = None
+        if is_available():
+            stdout = run_git(git_dir, ["rev-parse", "--show-toplevel"])
+            if stdout is not None:
+                root = Path(stdout.strip())
+        git_cache.roots[git_dir] = root
+
+    return git_cache.roots[git_dir]
+
+
+def get_status(git_dir, pathspec=".", untracked_files="normal"):
+    """Get `git status` entries for pathspec, relative to git_dir.
+
+    Returns:
+        List: One porcelain entry for each changed path, or None if the status
+            couldn't be read.
+    """
+    git_dir = Path(git_dir)
+    key = (git_dir, pathspec, untracked_files)
+    if key not in git_cache.statuses:
+        args = [
+            "status",
+            "--porcelain",
+            "-z",
+            f"--untracked-files={untracked_files}",
+            "--",
+            pathspec,
+        ]
+        stdout = run_git(git_dir, args)
+        entries = None if stdout is None else _split_status(stdout)
+        git_cache.statuses[key] = entries
+
+        if entries == []:
+            git_cache.clean_paths.add(git_dir / pathspec)
+
+    return git_cache.statuses[key]
+
+
+def ls_files(git_dir, pathspecs):
+    """List files tracked by Git in git_dir, matching pathspecs.
+
+    Returns:
+        List: Paths relative to git_dir, as posix strings.
+    """
+    git_dir = Path(git_dir)
+    args = ["ls-files", "--stage", "-z", "--"] + pathspecs
+    stdout = run_git(git_dir, args)
+    if not stdout:
+        return []
+
+    rel_paths = []
+    for entry in stdout.split("\0")[:-1]:
+        # Each entry is "<mode> <blob id> <stage>\t<path>".
+        info, rel_path = entry.split("\t", 1)
+        git_cache.blob_ids[git_dir / rel_path] = info.split(" ")[1]
+        rel_paths.append(rel_path)
+
+    return rel_paths
+
+
+def get_clean_blob_id(path):
+    """Get the blob id for path, if it's known to match what Git has stored."""
+    if (blob_id := git_cache.blob_ids.get(path)) is None:
+        return None
+
+    if any(p == path or p in path.parents for p in git_cache.clean_paths):
+        return blob_id
+    return None
+
+
+# --- Helper functions ---
+
+
+def _split_status(stdout):
+    """Split `git status --porcelain -z` output into entries."""
+    entries = []
+    fields = iter(stdout.split("\0")[:-1])
+    for entry in fields:
+        # Renames and copies are followed by the original path.
+        if entry[:1] in ("R", "C"):
+            entry += f" <- {next(fields, '')}"
+        entries.append(entry)
+
+    return entries
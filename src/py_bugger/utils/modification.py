@@ -1,42 +1,124 @@
 """Model for modifications made to files to introduce bugs.
 
 This is used to track which modifications have been made, so we don't make multiple
-modifications to the same node or line.
+modifications to the same node or line. Modifications are indexed by path and by
+the span of code they change, so checking whether some code overlaps an earlier
+modification is a binary search.
 
-Not currently using original_node or original_line, but including these means
-the list of modifications can be used to stage all changes, and write them all at
-once if that becomes a better approach.
-
-Note: If we move to a deferred writing model, line_num will need to be handled carefully.
-  May want to stage all changes, then before writing, add a new attribute new_line_num.
-  Parse list of mods, and for any mod that adds or removes a line, adjust new_line_num
-  for all subsequent modification instances.
+Modifications are staged while bugs are chosen, and applied when the run is finished,
+so each modified file is written once. Until then files don't change, so line
+numbers and spans always refer to the original code. When modifications are applied,
+any modification that adds or removes lines moves the lines after it. new_line_num
+is set for every modification, to account for those changes.
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Type
+from typing import TYPE_CHECKING, Type
 
-import libcst as cst
+if TYPE_CHECKING:
+    from py_bugger.utils.candidate import Candidate
 
 
 @dataclass
 class Modification:
     path: Path = ""
 
-    # Only data for a line or node will be set, not both.
-    # DEV: For line, may want to store line number?
-    original_node: cst.CSTNode = None
-    modified_node: cst.CSTNode = None
+    # The candidate this modification changes. Modifications keep candidates, never
+    # libcst nodes, so parsed trees can be released once every bug is planned.
+    candidate: "Candidate" = None
 
+    # Set for line modifications when they're applied.
     original_line: str = ""
     modified_line: str = ""
 
     # Line numbers are not zero-indexed. We count them like a user would.
     line_num: int = 0
 
+    # Span of the code this modification changes, as (line, column, end_line,
+    # end_column). Later bugs can't change code overlapping this span.
+    span: tuple = ()
+
+    # Code that replaces the span, for modifications that aren't line modifications.
+    new_code: str = ""
+
+    # Number of lines this modification adds, or removes if negative.
+    line_delta: int = 0
+
+    # Line number after all modifications to this file have been applied.
+    new_line_num: int = 0
+
     exception_induced: type[BaseException] = field(default=None)
 
+    @property
+    def is_line_modification(self):
+        """Whether this modification indents a whole line, not just its span."""
+        return self.candidate.kind == "indentation"
+
+
+class ModificationRegistry:
+    """All modifications made during this run.
+
+    This behaves like a list of modifications. Spans in one file never overlap, so
+    each file's modifications are also kept sorted by where their spans start.
+    """
+
+    def __init__(self):
+        self._modifications = []
+
+        # Path -> modifications with spans, sorted by span start.
+        self._path_modifications = {}
+
+        # Path -> span starts as (line, column), in the same order.
+        self._path_starts = {}
+
+    def append(self, modification):
+        self._modifications.append(modification)
+
+        if modification.span:
+            path = modification.path
+            starts = self._path_starts.setdefault(path, [])
+            index = bisect_left(starts, modification.span[:2])
+            starts.insert(index, modification.span[:2])
+            self._path_modifications.setdefault(path, []).insert(index, modification)
+
+    def clear(self):
+        self._modifications.clear()
+        self._path_modifications.clear()
+        self._path_starts.clear()
+
+    def overlaps(self, path, span):
+        """Check whether span overlaps code changed by any modification in path."""
+        starts = self._path_starts.get(path)
+        if not starts:
+            return False
+
+        # Only the last modification starting before span ends can overlap it. Spans
+        # are disjoint, so that modification also ends last.
+        index = bisect_left(starts, span[2:])
+        if index == 0:
+            return False
+        return self._path_modifications[path][index - 1].span[2:] > span[:2]
+
+    @property
+    def paths(self):
+        """Paths with staged modifications, in the order they were first modified."""
+        return list(self._path_modifications)
+
+    def get_path_modifications(self, path):
+        """Get all modifications for path, sorted by where their spans start."""
+        return list(self._path_modifications.get(path, []))
+
+    def __len__(self):
+        return len(self._modifications)
+
+    def __iter__(self):
+        return iter(self._modifications)
+
+    def __getitem__(self, index):
+        return self._modifications[index]
+
 
-# Only make one instance of this list.
-modifications = []
+# Only make one instance of this registry.
+modifications = ModificationRegistry()
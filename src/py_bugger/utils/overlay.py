@@ -0,0 +1,92 @@
+"""In-memory overlay of the user's files.
+
+Modified source is written to the overlay first. Reads of the user's code go through
+the overlay, so they see modified source before it's on disk. At the end of a run,
+the overlay is either written to disk, or shown as a patch for a dry run.
+
+Sources are bytes, exactly as they are on disk.
+"""
+
+from dataclasses import dataclass, field
+from io import BytesIO
+import os
+
+from py_bugger.utils.profiler import profiler
+
+
+@dataclass
+class Overlay:
+    # Path -> modified source that hasn't been written to disk.
+    sources: dict = field(default_factory=dict)
+
+    # Path -> original source on disk, for every path in sources.
+    originals: dict = field(default_factory=dict)
+
+    def read_bytes(self, path):
+        """Read path's source, from the overlay if it's been modified."""
+        if path in self.sources:
+            return self.sources[path]
+
+        with profiler.phase("read"):
+            source = path.read_bytes()
+        profiler.count("files_read")
+        profiler.count("bytes_read", len(source))
+        return source
+
+    def write_bytes(self, path, source):
+        """Write modified source to the overlay, not to disk."""
+        if path not in self.originals:
+            self.originals[path] = path.read_bytes()
+        self.sources[path] = source
+
+    def clear(self):
+        self.sources = {}
+        self.originals = {}
+
+    def get_patch(self, root_dir):
+        """Get a unified diff of every modified file, which `git apply` accepts.
+
+        Paths in the patch are relative to root_dir. The patch is bytes, so it
+        matches files in any encoding, with any line endings.
+        """
+        import difflib
+
+        patch = []
+        for path, source in self.sources.items():
+            rel_path = _get_rel_path(path, root_dir).encode()
+            diff = list(
+                difflib.diff_bytes(
+                    difflib.unified_diff,
+                    _split_lines(self.originals[path]),
+                    _split_lines(source),
+                    fromfile=b"a/" + rel_path,
+                    tofile=b"b/" + rel_path,
+                )
+            )
+            if not diff:
+                continue
+
+            patch.append(b"diff --git a/" + rel_path + b" b/" + rel_path + b"\n")
+            for line in diff:
+                if not line.endswith(b"\n"):
+                    line += b"\n\\ No newline at end of file\n"
+                patch.append(line)
+
+        return b"".join(patch)
+
+
+# Only make one instance of the overlay.
+overlay = Overlay()
+
+
+# --- Helper functions ---
+
+
+def _get_rel_path(path, root_dir):
+    """Get a posix path relative to root_dir."""
+    return os.path.relpath(path, root_dir).replace(os.sep, "/")
+
+
+def _split_lines(source):
+    """Split source into lines the way Git does, at each \\n only."""
+    return BytesIO(source).readlines()
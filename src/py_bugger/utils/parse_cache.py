@@ -0,0 +1,76 @@
+"""Per-run cache of parsed files.
+
+Parsing is the most expensive part of introducing a bug. Candidates are found with
+ast, but a file that's chosen for a bug needs the parsed module and its position
+metadata, so each of those files is parsed at most once per run.
+
+When a file is modified, its entry must be invalidated so the next read reflects
+the modified source.
+"""
+
+from dataclasses import dataclass
+import time
+from typing import TYPE_CHECKING
+
+from py_bugger.utils.events import events
+from py_bugger.utils.overlay import overlay
+from py_bugger.utils.profiler import profiler
+
+if TYPE_CHECKING:
+    from libcst.metadata import MetadataWrapper
+
+
+@dataclass
+class ParsedFile:
+    # The wrapper owns the module we visit and transform. Metadata is keyed by
+    # nodes in wrapper.module, not by nodes in the originally parsed tree.
+    wrapper: "MetadataWrapper" = None
+    metadata: dict = None
+
+    @property
+    def module(self):
+        return self.wrapper.module
+
+
+# Only make one instance of this dict. Keys are paths, values are ParsedFile instances.
+parsed_files = {}
+
+
+def get_parsed_file(path, source=None):
+    """Get the parsed version of a file, parsing it only if necessary.
+
+    Pass source if it's already been read from path.
+    """
+    if path not in parsed_files:
+        parsed_files[path] = parse_file(path, source)
+    else:
+        profiler.count("parse_cache_hits")
+
+    return parsed_files[path]
+
+
+def parse_file(path, source=None):
+    """Parse a file, without reading from or storing to the cache."""
+    # Importing libcst here keeps it out of runs that only make line-based bugs.
+    import libcst as cst
+    from libcst.metadata import MetadataWrapper, PositionProvider
+
+    if source is None:
+        source = overlay.read_bytes(path)
+
+    start = time.perf_counter()
+    with profiler.phase("parse"):
+        tree = cst.parse_module(source)
+    profiler.count("files_parsed")
+
+    with profiler.phase("metadata"):
+        wrapper = MetadataWrapper(tree)
+        metadata = wrapper.resolve(PositionProvider)
+    events.emit("on_file_parsed", path=path, elapsed=time.perf_counter() - start)
+
+    return ParsedFile(wrapper=wrapper, metadata=metadata)
+
+
+def invalidate(path):
+    """Drop the cached entry for a file that's been modified."""
+    parsed_files.pop(path, None)
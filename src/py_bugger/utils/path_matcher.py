@@ -0,0 +1,232 @@
+"""Decide which paths in the target project can be modified.
+
+Paths are excluded by patterns from several sources, in order of increasing priority:
+- Default patterns, which exclude test code. Outside of Git, they also exclude
+  virtual environments, build output, and vendored code;
+- .gitignore files, for projects that aren't managed by Git;
+- .pybuggerignore, in the target directory;
+- --exclude args.
+
+All patterns use .gitignore syntax, and a later pattern overrides an earlier one. For
+example `!tests/` in .pybuggerignore allows test code to be modified. If any --include
+args are passed, only files matching at least one of them are kept.
+
+Every pattern is compiled into one regular expression, so each path is matched once,
+no matter how many patterns there are. Paths are matched relative to the target
+directory, in posix form, with a trailing slash for directories.
+
+In a Git project, the default patterns are passed to `git ls-files` as pathspecs
+instead, so that filtering happens in Git. Git already leaves out whatever
+.gitignore lists, so directories such as build/ are only excluded by name when
+there's no Git to rely on; a tracked package named build/ is a real package.
+"""
+
+from dataclasses import dataclass, field
+import re
+
+
+PYBUGGERIGNORE_FILENAME = ".pybuggerignore"
+
+# Directories of test code, which are never searched for .py files unless a user
+# pattern re-includes them. These match whole path components, so latest_tests/
+# isn't excluded.
+TEST_DIRS = [
+    "tests",
+    "Tests",
+    "test_code",
+]
+
+# Directories that are also skipped when walking a project that isn't managed by Git.
+WALK_EXCLUDED_DIRS = [
+    # Virtual environments, and build output.
+    ".venv",
+    "venv",
+    "build",
+    "dist",
+    # Vendored and installed code.
+    "site-packages",
+    "node_modules",
+    "third_party",
+    # Tooling.
+    ".git",
+    "__pycache__",
+]
+
+# Test files are never modified either.
+EXCLUDED_FILES = ["conftest.py", "test_*.py"]
+
+GIT_DEFAULT_PATTERNS = [f"{dir_name}/" for dir_name in TEST_DIRS] + EXCLUDED_FILES
+DEFAULT_PATTERNS = GIT_DEFAULT_PATTERNS + [
+    f"{dir_name}/" for dir_name in WALK_EXCLUDED_DIRS
+]
+
+# The default patterns for a Git project, as pathspecs for `git ls-files`.
+GIT_PATHSPECS = (
+    [":(glob)**/*.py"]
+    + [f":(glob,exclude)**/{dir_name}/**" for dir_name in TEST_DIRS]
+    + [f":(glob,exclude)**/{filename}" for filename in EXCLUDED_FILES]
+)
+
+
+@dataclass
+class PathMatcher:
+    # Compiled patterns, as (regex, negated) pairs, in order of increasing priority.
+    default_patterns: list = field(default_factory=list)
+    gitignore_patterns: list = field(default_factory=list)
+    user_patterns: list = field(default_factory=list)
+    include_patterns: list = field(default_factory=list)
+
+    def __post_init__(self):
+        # The last matching pattern decides whether a path is excluded. Alternatives
+        # are tried in order, so list them from highest to lowest priority.
+        patterns = self.default_patterns + self.gitignore_patterns + self.user_patterns
+        patterns.reverse()
+        self._exclude_re = _compile(patterns)
+        self._negated = [negated for _, negated in patterns]
+
+        self._include_re = (
+            _compile(self.include_patterns) if self.include_patterns else None
+        )
+
+    @property
+    def has_user_patterns(self):
+        return bool(self.user_patterns or self.include_patterns)
+
+    @property
+    def overrides_defaults(self):
+        """Whether a user pattern may re-include files excluded by default."""
+        return any(negated for _, negated in self.user_patterns)
+
+    def is_excluded(self, rel_path, is_dir=False):
+        """Check whether a path, relative to the target directory, is excluded."""
+        if is_dir:
+            rel_path += "/"
+
+        if match := self._exclude_re.fullmatch(rel_path):
+            if not self._negated[match.lastindex - 1]:
+                return True
+
+        # Directories are always searched for included files.
+        if self._include_re and not is_dir:
+            return not self._include_re.fullmatch(rel_path)
+
+        return False
+
+    def with_gitignore(self, lines, rel_dir=""):
+        """Get a matcher that also applies a .gitignore file found in rel_dir."""
+        patterns = _translate_lines(lines, rel_dir)
+        if not patterns:
+            return self
+
+        return PathMatcher(
+            default_patterns=self.default_patterns,
+            gitignore_patterns=self.gitignore_patterns + patterns,
+            user_patterns=self.user_patterns,
+            include_patterns=self.include_patterns,
+        )
+
+
+def get_path_matcher(target_dir, include=(), exclude=(), git=False):
+    """Build a matcher for target_dir, from .pybuggerignore and CLI args.
+
+    With git=True, the default patterns are the ones for files listed by Git.
+    """
+    user_lines = []
+    path_ignore = target_dir / PYBUGGERIGNORE_FILENAME
+    if path_ignore.is_file():
+        user_lines += path_ignore.read_text().splitlines()
+    user_lines += exclude
+
+    return PathMatcher(
+        default_patterns=_translate_lines(
+            GIT_DEFAULT_PATTERNS if git else DEFAULT_PATTERNS
+        ),
+        user_patterns=_translate_lines(user_lines),
+        include_patterns=_translate_lines(include),
+    )
+
+
+# --- Helper functions ---
+
+
+def _compile(patterns):
+    """Compile patterns into one regex, with one group for each pattern."""
+    if not patterns:
+        # Never matches.
+        return re.compile("(?!)")
+
+    alternatives = "|".join(f"({regex})" for regex, _ in patterns)
+    return re.compile(alternatives, re.DOTALL)
+
+
+def _translate_lines(lines, rel_dir=""):
+    """Translate the lines of an ignore file to (regex, negated) pairs."""
+    patterns = []
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        patterns.append(_translate(line, rel_dir))
+
+    return patterns
+
+
+def _translate(pattern, rel_dir=""):
+    """Translate a .gitignore pattern in rel_dir to a (regex, negated) pair."""
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith("\\"):
+        # Escaped leading ! or #.
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+
+    # A pattern with a slash before its end only matches relative to its own dir.
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    prefix = re.escape(f"{rel_dir}/") if rel_dir else ""
+    if not anchored:
+        prefix += "(?:.*/)?"
+
+    # A matched directory excludes everything in it.
+    suffix = "/.*" if dir_only else "(?:/.*)?"
+
+    return prefix + _translate_glob(pattern) + suffix, negated
+
+
+def _translate_glob(pattern):
+    """Translate the glob part of a pattern to a regex."""
+    regex = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == "*":
+            if pattern[i : i + 1] == "*":
+                i += 1
+                if pattern[i : i + 1] == "/":
+                    # **/ matches zero or more directories.
+                    i += 1
+                    regex.append("(?:.*/)?")
+                else:
+                    regex.append(".*")
+            else:
+                regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[" and (end := pattern.find("]", i + 1)) != -1:
+            char_class = pattern[i:end].replace("\\", "\\\\")
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]
+            regex.append(f"[{char_class}]")
+            i = end + 1
+        elif char == "\\" and i < n:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+        else:
+            regex.append(re.escape(char))
+
+    return "".join(regex)
@@ -0,0 +1,152 @@
+"""Record where the time goes in a run, for --profile.
+
+Each phase records wall and CPU time. Times are exclusive: while one phase runs
+inside another, its time isn't counted toward the outer phase. Counters record how
+much work was done, such as files scanned and bytes read. Worker processes send
+their counters back to be added to the parent's. Time spent in workers is part of
+the parent's "collect" phase.
+
+Profiling is off unless it's requested. Then phase() returns a shared context
+manager that does nothing, and count() returns immediately, so both can stay in
+hot code.
+"""
+
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+import time
+
+
+# Phases, in the order they're reported.
+PHASES = [
+    "validation",
+    "git",
+    "discovery",
+    "import",
+    "read",
+    "parse",
+    "metadata",
+    "collect",
+    "select",
+    "transform",
+    "write",
+]
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass
+class Profiler:
+    enabled: bool = False
+
+    # Phase -> [wall time, CPU time, number of calls].
+    phases: dict = field(default_factory=dict)
+
+    # Counter name -> value.
+    counters: dict = field(default_factory=dict)
+
+    # Wall and CPU time when profiling started.
+    start_times: tuple = ()
+
+    # Time spent in nested phases, for each phase that's currently running.
+    _child_times: list = field(default_factory=list)
+
+    def enable(self):
+        self.clear()
+        self.enabled = True
+        self.start_times = (time.perf_counter(), time.process_time())
+
+    def clear(self):
+        self.enabled = False
+        self.phases = {}
+        self.counters = {}
+        self.start_times = ()
+        self._child_times = []
+
+    def phase(self, name):
+        """Time a phase: `with profiler.phase("parse"): ...`"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _PhaseTimer(self, name)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_counters(self, counters):
+        """Add counters recorded by another profiler, such as a worker process's."""
+        for name, value in counters.items():
+            self.count(name, value)
+
+    def get_report(self):
+        """Get the report as a dict, which can be written as JSON."""
+        wall_start, cpu_start = self.start_times
+        return {
+            "total": {
+                "wall": time.perf_counter() - wall_start,
+                "cpu": time.process_time() - cpu_start,
+            },
+            "phases": {
+                phase: dict(zip(["wall", "cpu", "calls"], self.phases[phase]))
+                for phase in PHASES
+                if phase in self.phases
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def format_report(self):
+        """Get the report as a table."""
+        report = self.get_report()
+
+        lines = [
+            "",
+            f"{'Phase':<12} {'Wall (ms)':>10} {'CPU (ms)':>10} {'Calls':>8}",
+        ]
+        rows = list(report["phases"].items()) + [("total", report["total"])]
+        for phase, times in rows:
+            calls = times.get("calls", "")
+            wall_ms, cpu_ms = times["wall"] * 1000, times["cpu"] * 1000
+            lines.append(f"{phase:<12} {wall_ms:10.1f} {cpu_ms:10.1f} {calls:>8}")
+
+        if report["counters"]:
+            lines += ["", f"{'Counter':<30} {'Value':>10}"]
+            for name, value in report["counters"].items():
+                lines.append(f"{name:<30} {value:>10}")
+
+        return "\n".join(lines)
+
+    def write_report(self, path):
+        import json
+
+        path.write_text(json.dumps(self.get_report(), indent=2))
+
+
+class _PhaseTimer:
+    """Context manager that records one call to a phase."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._child_times.append((0.0, 0.0))
+        self.start = (time.perf_counter(), time.process_time())
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start[0]
+        cpu = time.process_time() - self.start[1]
+
+        child_wall, child_cpu = self.profiler._child_times.pop()
+        totals = self.profiler.phases.setdefault(self.name, [0.0, 0.0, 0])
+        totals[0] += wall - child_wall
+        totals[1] += cpu - child_cpu
+        totals[2] += 1
+
+        # Report this phase's time to the phase it's nested in.
+        if child_times := self.profiler._child_times:
+            parent_wall, parent_cpu = child_times[-1]
+            child_times[-1] = (parent_wall + wall, parent_cpu + cpu)
+
+
+# Only make one instance of the profiler.
+profiler = Profiler()
+
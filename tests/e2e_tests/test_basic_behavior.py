@@ -11,7 +11,6 @@ import subprocess
 import filecmp
 import os
 import sys
-import platform
 
 import pytest
 
@@ -297,15 +296,10 @@ def test_random_py_file_affected(tmp_path_factory, test_config):
     assert "All requested bugs inserted." in stdout
 
     # Run file, should raise ModuleNotFoundError.
-    # When we collect files, the order is different on different OSes.
-    if platform.system() in ["Windows", "Linux"]:
-        path_modified = path_dst_ten_imports
-        path_unmodified = path_dst_system_info
-        path_unmodified_original = test_config.path_system_info
-    else:
-        path_modified = path_dst_system_info
-        path_unmodified = path_dst_ten_imports
-        path_unmodified_original = test_config.path_ten_imports
+    # Files are sorted before they're sampled, so the same file is chosen on every OS.
+    path_modified = path_dst_system_info
+    path_unmodified = path_dst_ten_imports
+    path_unmodified_original = test_config.path_ten_imports
 
     cmd = f"{test_config.python_cmd.as_posix()} {path_modified.as_posix()}"
     cmd_parts = shlex.split(cmd)
@@ -592,8 +586,11 @@ def test_indentation_error_complex(tmp_path_factory, test_config):
     cmd = f"{test_config.python_cmd.as_posix()} {path_dst.as_posix()}"
     cmd_parts = shlex.split(cmd)
     stderr = subprocess.run(cmd_parts, capture_output=True).stderr.decode()
-    assert "IndentationError: unexpected indent" in stderr
-    assert 'many_dogs.py", line 1' in stderr
+    assert (
+        "IndentationError: expected an indented block after function definition on line 2"
+        in stderr
+    )
+    assert 'many_dogs.py", line 3' in stderr
 
 
 def test_all_indentation_blocks(tmp_path_factory, test_config):
@@ -8,6 +8,7 @@ import shutil
 import shlex
 import subprocess
 import filecmp
+import json
 import os
 import sys
 
@@ -49,3 +50,86 @@ def test_verbose_flag_false(tmp_path_factory, test_config):
     assert "All requested bugs inserted." in stdout
     assert "Added bug." in stdout
     assert "name_picker.py" not in stdout
+
+
+def test_dry_run(tmp_path_factory, test_config):
+    """py-bugger --exception-type AttributeError --dry-run"""
+
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    path_dst = tmp_path / test_config.path_name_picker.name
+    shutil.copyfile(test_config.path_name_picker, path_dst)
+
+    # Run py-bugger against directory. No Git status check is needed for a dry run.
+    cmd = f"py-bugger --exception-type AttributeError --target-dir {tmp_path.as_posix()} --dry-run"
+    cmd_parts = shlex.split(cmd)
+    result = subprocess.run(cmd_parts, capture_output=True)
+    stdout, stderr = result.stdout.decode(), result.stderr.decode()
+
+    # Only the patch goes to stdout, so it can be redirected to a file.
+    assert stdout.startswith("diff --git a/name_picker.py b/name_picker.py")
+    assert "--- a/name_picker.py" in stdout
+    assert "+++ b/name_picker.py" in stdout
+    assert "Added bug" not in stdout
+    assert "Dry run" not in stdout
+
+    assert "Added bug." in stderr
+    assert "Dry run: all requested bugs planned. No files were modified." in stderr
+
+    # The file should be unchanged, and nothing else should be written.
+    assert filecmp.cmp(test_config.path_name_picker, path_dst)
+    assert [p.name for p in tmp_path.iterdir()] == ["name_picker.py"]
+
+
+def test_patch_file(tmp_path_factory, test_config):
+    """A patch from a dry run should make the same changes as a real run."""
+
+    # Make two copies of the sample code. One is modified by py-bugger, and the
+    # patch is applied to the other.
+    path_bugged = tmp_path_factory.mktemp("sample_code_bugged")
+    path_patched = tmp_path_factory.mktemp("sample_code_patched")
+    for path in (path_bugged, path_patched):
+        shutil.copyfile(test_config.path_name_picker, path / "name_picker.py")
+        shutil.copyfile(test_config.path_dog_bark, path / "dog_bark.py")
+
+    path_patch = tmp_path_factory.mktemp("patches") / "bugs.patch"
+    cmd = f"py-bugger -n 3 --target-dir {path_patched.as_posix()} --dry-run --patch-file {path_patch.as_posix()}"
+    subprocess.run(shlex.split(cmd), capture_output=True)
+
+    cmd = f"py-bugger -n 3 --target-dir {path_bugged.as_posix()} --ignore-git-status"
+    subprocess.run(shlex.split(cmd), capture_output=True)
+
+    # Apply the patch.
+    assert path_patch.read_text().startswith("diff --git a/")
+    cmd = f"git apply {path_patch.as_posix()}"
+    subprocess.run(shlex.split(cmd), cwd=path_patched, check=True)
+
+    for name in ("name_picker.py", "dog_bark.py"):
+        assert filecmp.cmp(path_bugged / name, path_patched / name, shallow=False)
+
+
+def test_profile(tmp_path_factory, test_config):
+    """py-bugger --exception-type AttributeError --profile --profile-output"""
+
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_dst = tmp_path / test_config.path_name_picker.name
+    shutil.copyfile(test_config.path_name_picker, path_dst)
+
+    path_report = tmp_path_factory.mktemp("reports") / "profile.json"
+    cmd = f"py-bugger --exception-type AttributeError --target-dir {tmp_path.as_posix()} --ignore-git-status --profile --profile-output {path_report.as_posix()}"
+    cmd_parts = shlex.split(cmd)
+    stdout = subprocess.run(cmd_parts, capture_output=True).stdout.decode()
+
+    assert "All requested bugs inserted." in stdout
+    assert "Wall (ms)" in stdout
+    assert "files_scanned" in stdout
+
+    report = json.loads(path_report.read_text())
+    phases = {"discovery", "import", "read", "parse", "collect", "select", "write"}
+    assert phases <= set(report["phases"])
+    assert report["counters"]["files_scanned"] == 1
+    assert report["counters"]["files_written"] == 1
+    assert report["counters"]["candidates_attribute"] > 0
@@ -0,0 +1,85 @@
+"""Tests for startup cost.
+
+Every run imports py-bugger's CLI, so the cost of imports is paid by every call,
+including `--help` and runs that stop at validation. libcst is by far the most
+expensive dependency, and it's only needed for bugs that require parsing.
+
+Timing imports is too noisy to test reliably, so these tests check which modules
+end up in sys.modules instead. The CLI runs in a fresh interpreter, which reports
+sys.modules as it exits.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+
+
+# Runs the CLI with the args passed after -c, and writes sys.modules to stderr on exit.
+RUN_CLI = """
+import atexit, json, sys
+atexit.register(lambda: print(json.dumps(sorted(sys.modules)), file=sys.stderr))
+from py_bugger.cli.cli import cli
+cli(prog_name="py-bugger")
+"""
+
+
+# --- Helper functions ---
+
+
+def get_imported_modules(args):
+    """Run py-bugger with args, and get the modules in sys.modules when it exits."""
+    cmd_parts = [sys.executable, "-c", RUN_CLI] + args
+    stderr = subprocess.run(cmd_parts, capture_output=True, text=True).stderr
+    return set(json.loads(stderr.splitlines()[-1]))
+
+
+def is_imported(modules, package):
+    return any(name.split(".")[0] == package for name in modules)
+
+
+# --- Test functions ---
+
+
+def test_help_imports():
+    """`py-bugger --help` shouldn't import anything needed only for making bugs."""
+    modules = get_imported_modules(["--help"])
+
+    assert "py_bugger.cli.cli" in modules
+    assert not is_imported(modules, "libcst")
+    assert "py_bugger.py_bugger" not in modules
+    assert "subprocess" not in modules
+
+
+def test_validation_failure_imports():
+    """A run that fails validation shouldn't import libcst."""
+    modules = get_imported_modules(["-e", "IndentationErr"])
+
+    assert "py_bugger.cli.cli" in modules
+    assert not is_imported(modules, "libcst")
+    assert "py_bugger.py_bugger" not in modules
+
+
+def test_line_based_run_imports(tmp_path_factory, test_config):
+    """A run that only makes line-based bugs shouldn't import libcst."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_dst = tmp_path / test_config.path_name_picker.name
+    shutil.copyfile(test_config.path_name_picker, path_dst)
+
+    args = ["-e", "IndentationError", "--target-dir", tmp_path.as_posix()]
+    modules = get_imported_modules(args + ["--ignore-git-status"])
+
+    assert "py_bugger.py_bugger" in modules
+    assert not is_imported(modules, "libcst")
+
+
+def test_parsing_run_imports_libcst(tmp_path_factory, test_config):
+    """Make sure the checks above would notice libcst being imported."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_dst = tmp_path / test_config.path_name_picker.name
+    shutil.copyfile(test_config.path_name_picker, path_dst)
+
+    args = ["-e", "AttributeError", "--target-dir", tmp_path.as_posix()]
+    modules = get_imported_modules(args + ["--ignore-git-status"])
+
+    assert is_imported(modules, "libcst")
@@ -4,9 +4,18 @@ Any test that's more than a unit test, but doesn't require running py-bugger aga
 actual code should probably be an integration test.
 """
 
+import shutil
+
+import libcst as cst
 import pytest
 
 from py_bugger.utils.modification import modifications
+from py_bugger.utils.parse_cache import parsed_files
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.overlay import overlay
+from py_bugger.utils.git_utils import git_cache
+from py_bugger.utils.profiler import profiler
+from py_bugger.utils.events import events
 from py_bugger.cli.config import pb_config
 
 
@@ -15,20 +24,75 @@ def reset_state():
     """Reset the shared state objects for each test."""
 
     # Reset pb_config.
-    pb_config.exception_type = ""
+    pb_config.exception_type = ()
     pb_config.target_dir = ""
     pb_config.target_file = ""
     pb_config.target_lines = ""
+    pb_config.include = ()
+    pb_config.exclude = ()
     pb_config.num_bugs = 1
     pb_config.ignore_git_status = False
+    pb_config.untracked_files = "normal"
+    pb_config.jobs = 1
+    pb_config.candidate_quota = 0
+    pb_config.candidate_store = "reservoir"
+    pb_config.dry_run = False
+    pb_config.patch_file = ""
+    pb_config.profile = False
+    pb_config.profile_output = ""
+    pb_config.profile_stats = ""
     pb_config.verbose = True
 
     # Reset list of modifications.
     modifications.clear()
 
+    # Reset cache of parsed files.
+    parsed_files.clear()
+
+    # Reset candidate index.
+    candidate_index.clear()
+
+    # Reset overlay of modified files.
+    overlay.clear()
+
+    # Reset cached Git results.
+    git_cache.clear()
+
+    # Reset profiling.
+    profiler.clear()
+
+    # Reset event subscribers.
+    events.clear()
+
     # Customize some state. For some tests, you may need to override
     # these customizations in specific test functions.
 
     # For most integration tests, we're targeting a sample file or directory
     # that has not been set up as a Git repo.
     pb_config.ignore_git_status = True
+
+
+@pytest.fixture
+def sample_dir(tmp_path_factory, test_config):
+    """Copy all sample scripts to a tmp dir."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    for path_src in test_config.path_sample_scripts.glob("*.py"):
+        shutil.copyfile(path_src, tmp_path / path_src.name)
+
+    return tmp_path
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """Count calls to cst.parse_module() made through the parse cache."""
+    parses = []
+    parse_module = cst.parse_module
+
+    def counting_parse_module(source):
+        parses.append(source)
+        return parse_module(source)
+
+    monkeypatch.setattr(cst, "parse_module", counting_parse_module)
+    return parses
@@ -0,0 +1,224 @@
+"""Test applying staged modifications to files."""
+
+import pytest
+
+from py_bugger import buggers
+from py_bugger.cli.config import pb_config
+from py_bugger.utils import apply_utils
+from py_bugger.utils import file_utils
+from py_bugger.utils.modification import modifications
+
+
+@pytest.fixture
+def written_paths(monkeypatch):
+    """Record every path written by write_sources()."""
+    paths = []
+    write_sources = file_utils.write_sources
+
+    def recording_write_sources(sources):
+        paths.extend(sources)
+        write_sources(sources)
+
+    monkeypatch.setattr(file_utils, "write_sources", recording_write_sources)
+    return paths
+
+
+def test_files_unchanged_until_applied(tmp_path, written_paths):
+    """Several bugs in one file should be staged, then written once."""
+    path = tmp_path / "dogs.py"
+    source = "import os\nimport sys\n\nprint(os.sep, sys.path)\n"
+    path.write_text(source)
+    pb_config.num_bugs = 3
+
+    assert buggers.module_not_found_bugger([path])
+    assert buggers.attribute_error_bugger([path])
+    assert buggers.attribute_error_bugger([path])
+    assert path.read_text() == source
+
+    # Applied modifications stay in memory until they're written.
+    apply_utils.apply_modifications()
+    assert path.read_text() == source
+
+    apply_utils.write_modifications()
+
+    assert written_paths == [path]
+    assert len(modifications) == 3
+    assert path.read_text() != source
+
+
+def test_new_line_nums(tmp_path):
+    """Joining a multi-line import moves the lines after it."""
+    path = tmp_path / "dog.py"
+    path.write_text("import os, \\\n    sys\n\ndef bark():\n    print('woof')\n")
+    pb_config.num_bugs = 2
+
+    assert buggers.module_not_found_bugger([path])
+    assert buggers.indentation_error_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    indentation_modification = modifications[1]
+    assert indentation_modification.line_num == 4
+    assert indentation_modification.new_line_num == 3
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 4
+    assert lines[2] == "    def bark():"
+    assert indentation_modification.modified_line == "    def bark():\n"
+
+
+def test_only_spans_change(tmp_path):
+    """Splicing modifications in should leave all other code untouched."""
+    path = tmp_path / "dogs.py"
+    lines = [f"# filler {n}\n" for n in range(1000)]
+    source = "".join(lines) + "import os; import sys\n\nif True:\n    print(os.sep)\n"
+    path.write_text(source)
+    pb_config.num_bugs = 4
+
+    for _ in range(2):
+        assert buggers.module_not_found_bugger([path])
+    assert buggers.attribute_error_bugger([path])
+    assert buggers.indentation_error_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    new_lines = path.read_text().splitlines(keepends=True)
+    assert new_lines[:1000] == lines
+
+    # The semicolon between the imports is kept.
+    import_1, import_2 = new_lines[1000].split("; ")
+    assert import_1.startswith("import ") and import_1 != "import os"
+    assert import_2.startswith("import ") and import_2 != "import sys\n"
+
+    assert new_lines[1002] == "    if True:\n"
+    assert new_lines[1003].startswith("    print(os.")
+    assert new_lines[1003] != "    print(os.sep)\n"
+
+
+def test_multiline_import_last_line(tmp_path):
+    """A span can end on the last line, which has no line ending."""
+    path = tmp_path / "dog.py"
+    path.write_text("print('woof')\nimport os, \\\n    sys")
+    pb_config.num_bugs = 1
+
+    assert buggers.module_not_found_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    lines = path.read_text().split("\n")
+    assert lines[0] == "print('woof')"
+    assert len(lines) == 2
+    assert lines[1].startswith("import ") and "sys" not in lines[1]
+
+
+def test_encoding_and_line_endings_kept(tmp_path):
+    """Only the modified span changes, in a latin-1 file with CRLF line endings."""
+    path = tmp_path / "dog.py"
+    lines = [
+        "# -*- coding: latin-1 -*-\r\n",
+        "import os\r\n",
+        'name = "café"; print(os.sep)\r\n',
+    ]
+    source = "".join(lines).encode("latin-1")
+    path.write_bytes(source)
+    pb_config.num_bugs = 1
+
+    assert buggers.attribute_error_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    new_lines = path.read_bytes().decode("latin-1").splitlines(keepends=True)
+    assert new_lines[:2] == lines[:2]
+    assert new_lines[2].startswith('name = "café"; print(os.')
+    assert new_lines[2].endswith(")\r\n")
+    assert new_lines[2] != lines[2]
+
+
+def test_non_ascii_attribute(tmp_path):
+    """Only the attribute name is replaced, even if ast would normalize it."""
+    path = tmp_path / "dog.py"
+    path.write_text("obj.ﬁle = 1\n", encoding="utf-8")
+    pb_config.num_bugs = 1
+
+    assert buggers.attribute_error_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    assert modifications[0].exception_induced == AttributeError
+    new_source = path.read_text(encoding="utf-8")
+    assert new_source.startswith("obj.")
+    assert new_source.endswith(" = 1\n")
+    assert new_source != "obj.ﬁle = 1\n"
+
+
+def test_bom_kept(tmp_path):
+    path = tmp_path / "dog.py"
+    path.write_bytes(b"\xef\xbb\xbfif True:\n    print('\xc3\xa9'.upper())\n")
+    pb_config.num_bugs = 2
+
+    assert buggers.attribute_error_bugger([path])
+    assert buggers.indentation_error_bugger([path])
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    new_source = path.read_bytes()
+    assert new_source.startswith(b"\xef\xbb\xbf    if True:\n    print('\xc3\xa9'.")
+    assert not new_source.endswith(b".upper())\n")
+
+
+def test_failed_write_rolled_back(tmp_path, monkeypatch):
+    """If any file can't be replaced, every file should be left unmodified."""
+    sources = {}
+    for name in ["a.py", "b.py", "c.py"]:
+        path = tmp_path / name
+        path.write_text(f"# {name}\n")
+        sources[path] = f"# modified {name}\n".encode()
+
+    # Fail when replacing the last file.
+    replace = file_utils.os.replace
+
+    def failing_replace(src, dst):
+        # Paths are resolved before they're written, so compare names.
+        if dst.name == "c.py":
+            raise OSError("Disk full.")
+        replace(src, dst)
+
+    monkeypatch.setattr(file_utils.os, "replace", failing_replace)
+
+    with pytest.raises(OSError):
+        file_utils.write_sources(sources)
+
+    monkeypatch.undo()
+
+    # Originals are restored, and no temp files are left behind.
+    for path in sources:
+        assert path.read_text() == f"# {path.name}\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "b.py", "c.py"]
+
+
+def test_permissions_kept(tmp_path):
+    path = tmp_path / "script.py"
+    path.write_text("print('hi')\n")
+    path.chmod(0o755)
+
+    file_utils.write_sources({path: b"print('hello')\n"})
+
+    assert path.read_text() == "print('hello')\n"
+    assert path.stat().st_mode & 0o777 == 0o755
+
+
+def test_symlink_written_through(tmp_path, on_windows):
+    """Writing a symlinked file should modify its target, and keep the link."""
+    if on_windows:
+        pytest.skip("Creating symlinks on Windows needs extra privileges.")
+
+    path_target = tmp_path / "target.py"
+    path_target.write_text("print('hi')\n")
+    path_link = tmp_path / "link.py"
+    path_link.symlink_to(path_target)
+
+    file_utils.write_sources({path_link: b"print('hello')\n"})
+
+    assert path_link.is_symlink()
+    assert path_target.read_text() == "print('hello')\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.py", "target.py"]
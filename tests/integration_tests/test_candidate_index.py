@@ -0,0 +1,146 @@
+"""Test the persistent candidate index."""
+
+import json
+import subprocess
+
+import pytest
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import parse_cache
+from py_bugger.utils import candidate_index as ci_module
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.modification import modifications
+
+
+def _build_index(target_dir):
+    """Equivalent of `py-bugger index --target-dir target_dir`."""
+    pb_config.target_dir = target_dir
+    cli_utils.validate_index_config()
+    py_bugger.index()
+
+    # Start the next run with fresh in-memory state.
+    parse_cache.parsed_files.clear()
+    candidate_index.clear()
+
+
+def _git_init(path):
+    """Make path a Git repo with a single commit."""
+    for cmd in (["init"], ["add", "."], ["commit", "-m", "Initial state."]):
+        subprocess.run(["git", "-C", path.as_posix()] + cmd, capture_output=True)
+
+
+def test_index_created(sample_dir):
+    """`py-bugger index` should store candidates for every file."""
+    _build_index(sample_dir)
+
+    path_cache_dir = sample_dir / ci_module.CACHE_DIR_NAME
+    assert (path_cache_dir / ".gitignore").exists()
+
+    data = json.loads((path_cache_dir / ci_module.INDEX_FILENAME).read_text())
+    assert len(data["entries"]) == len(list(sample_dir.glob("*.py")))
+    for entry in data["entries"].values():
+        assert set(entry) == {"import", "attribute", "indentation"}
+
+
+@pytest.mark.parametrize("exception_type", ["AttributeError", "ModuleNotFoundError"])
+def test_warm_run_parses_only_modified_file(sample_dir, count_parses, exception_type):
+    """With a warm index, only the file that gets a bug should be parsed."""
+    _build_index(sample_dir)
+    count_parses.clear()
+
+    pb_config.target_dir = sample_dir
+    pb_config.exception_type = (exception_type,)
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 1
+    assert len(count_parses) == 1
+
+
+def test_lru_eviction(sample_dir, monkeypatch):
+    """The index should never hold more than MAX_ENTRIES files."""
+    monkeypatch.setattr(ci_module, "MAX_ENTRIES", 2)
+    _build_index(sample_dir)
+
+    path_index = sample_dir / ci_module.CACHE_DIR_NAME / ci_module.INDEX_FILENAME
+    data = json.loads(path_index.read_text())
+    assert len(data["entries"]) == 2
+
+
+def test_changed_file_reindexed_git(sample_dir):
+    """A file changed since the last indexed commit shouldn't use stale candidates."""
+    _git_init(sample_dir)
+    _build_index(sample_dir)
+
+    # Remove all imports from every file, without committing.
+    for path in sample_dir.glob("*.py"):
+        lines = path.read_text().splitlines(keepends=True)
+        lines = [line for line in lines if not line.startswith("import ")]
+        path.write_text("".join(lines))
+
+    pb_config.target_dir = sample_dir
+    pb_config.exception_type = ("ModuleNotFoundError",)
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 0
+
+
+def test_unchanged_files_not_hashed_git(sample_dir, monkeypatch):
+    """In a Git project, files unchanged since the last index shouldn't even be read."""
+    _git_init(sample_dir)
+    _build_index(sample_dir)
+
+    hashed_paths = []
+    get_blob_id = ci_module._get_blob_id
+
+    def recording_get_blob_id(path):
+        hashed_paths.append(path)
+        return get_blob_id(path)
+
+    monkeypatch.setattr(ci_module, "_get_blob_id", recording_get_blob_id)
+
+    pb_config.target_dir = sample_dir
+    pb_config.exception_type = ("IndentationError",)
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 1
+    assert hashed_paths == []
+
+
+def test_changed_untracked_file_reindexed_git(sample_dir, monkeypatch):
+    """An untracked file changed between runs shouldn't use stale candidates."""
+    _git_init(sample_dir)
+    path_untracked = sample_dir / "untracked.py"
+    path_untracked.write_text("for num in range(3):\n    print(num)\n")
+    _build_index(sample_dir)
+
+    # Run against the untracked file from the project root, so its candidates are
+    # looked up in the index.
+    monkeypatch.chdir(sample_dir)
+    pb_config.target_dir = ""
+    pb_config.target_file = path_untracked
+    pb_config.target_lines = "1"
+    pb_config.exception_type = ("IndentationError",)
+    cli_utils.validate_config()
+    py_bugger.main()
+    assert len(modifications) == 1
+
+    # Line 1 no longer opens a block, so there's nothing to indent.
+    path_untracked.write_text("x = 1\nfor num in range(3):\n    print(num)\n")
+    parse_cache.parsed_files.clear()
+    candidate_index.clear()
+    modifications.clear()
+    pb_config.target_dir = ""
+    pb_config.target_lines = "1"
+    cli_utils.validate_config()
+    py_bugger.main()
+
+    assert len(modifications) == 0
+    assert path_untracked.read_text().startswith("x = 1\n")
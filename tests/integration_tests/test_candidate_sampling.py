@@ -0,0 +1,118 @@
+"""Test sampling candidates, without holding every candidate in memory."""
+
+import random
+import shutil
+
+import pytest
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils import file_utils
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.modification import modifications
+
+
+@pytest.fixture
+def collected_paths(monkeypatch):
+    """Record the paths that candidates are collected from."""
+    paths = []
+    collect_rows = candidate_utils.collect_rows
+
+    def recording_collect_rows(path, kinds):
+        paths.append(path)
+        return collect_rows(path, kinds)
+
+    monkeypatch.setattr(candidate_utils, "collect_rows", recording_collect_rows)
+    return paths
+
+
+@pytest.mark.parametrize("k", [1, 3, 1000])
+def test_sample_size(sample_dir, k):
+    """Samples hold at most k candidates, and all candidates if there are fewer."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    all_candidates = candidate_utils.get_candidates(py_files, ["attribute"])[
+        "attribute"
+    ]
+
+    sample = candidate_utils.sample_candidates(py_files, "attribute", k=k)
+
+    assert len(sample) == min(k, len(all_candidates))
+    assert set(sample) <= set(all_candidates)
+
+
+def test_every_candidate_can_be_sampled(sample_dir):
+    """Over many seeds, every candidate should show up in a sample of one."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    all_candidates = candidate_utils.get_candidates(py_files, ["import"])["import"]
+
+    sampled = set()
+    for seed in range(500):
+        random.seed(seed)
+        sampled.update(candidate_utils.sample_candidates(py_files, "import", k=1))
+
+    assert sampled == set(all_candidates)
+
+
+def test_quota_stops_collection(sample_dir, collected_paths):
+    """Files should stop being visited once the quota is met."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    pb_config.exception_type = ("AttributeError",)
+    pb_config.candidate_quota = 1
+
+    sample = candidate_utils.sample_candidates(py_files, "attribute", k=1)
+
+    assert len(sample) == 1
+    assert len(collected_paths) < len(py_files)
+
+    # Files visited before the quota was met had no attributes.
+    assert sample[0].path == collected_paths[-1]
+
+
+@pytest.mark.parametrize("candidate_store", ["reservoir", "columnar"])
+def test_quota_below_num_bugs(sample_dir, candidate_store):
+    """A quota smaller than the number of bugs shouldn't cut the run short."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    all_candidates = candidate_utils.get_candidates(py_files, ["attribute"])[
+        "attribute"
+    ]
+    assert len(all_candidates) > 20
+
+    pb_config.target_dir = sample_dir
+    pb_config.exception_type = "AttributeError"
+    pb_config.num_bugs = 20
+    pb_config.candidate_quota = 3
+    pb_config.candidate_store = candidate_store
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 20
+
+
+@pytest.mark.parametrize("num_bugs", [1, 3, 10])
+def test_columnar_store(tmp_path_factory, test_config, num_bugs):
+    """The columnar store should introduce the same number of bugs, reproducibly."""
+    results = []
+    for _ in range(2):
+        tmp_path = tmp_path_factory.mktemp("sample_code")
+        for filename in ["dog_bark.py", "name_picker.py", "system_info_script.py"]:
+            shutil.copyfile(
+                test_config.path_sample_scripts / filename, tmp_path / filename
+            )
+
+        modifications.clear()
+        pb_config.target_dir = tmp_path
+        pb_config.num_bugs = num_bugs
+        pb_config.candidate_store = "columnar"
+        cli_utils.validate_config()
+        py_bugger.main()
+
+        results.append(sorted(p.read_text() for p in tmp_path.iterdir() if p.is_file()))
+        assert len(modifications) == num_bugs
+
+        # Rows are only held in the store's columns.
+        assert candidate_index.run_entries == {}
+
+    assert results[0] == results[1]
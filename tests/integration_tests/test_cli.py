@@ -48,3 +48,15 @@ def test_exception_type_unsupported():
 
     msg_expected = cli_messages.msg_unsupported_exception_type(exception_type)
     assert msg_expected in stdout
+
+
+def test_negative_candidate_quota():
+    """Test appropriate handling of a negative candidate quota."""
+    cmd = "py-bugger --candidate-quota -1 --target-file nonexistent_python_file.py --ignore-git-status"
+    print("cmd:", cmd)
+    cmd_parts = shlex.split(cmd)
+
+    stdout = subprocess.run(cmd_parts, capture_output=True, text=True).stdout
+
+    msg_expected = cli_messages.msg_invalid_candidate_quota(-1)
+    assert msg_expected in stdout
@@ -0,0 +1,95 @@
+"""Test events for observing a run."""
+
+import re
+import shutil
+
+import pytest
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils.events import events, EVENT_NAMES
+
+
+@pytest.fixture
+def received(tmp_path_factory, test_config):
+    """Subscribe to every event, and target a copy of some sample scripts."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    for filename in ["dog_bark.py", "name_picker.py", "system_info_script.py"]:
+        shutil.copyfile(test_config.path_sample_scripts / filename, tmp_path / filename)
+    pb_config.target_dir = tmp_path
+
+    received = {name: [] for name in EVENT_NAMES}
+    for name in EVENT_NAMES:
+        events.subscribe(name, received[name].append)
+    return received
+
+
+def test_events(received):
+    pb_config.num_bugs = 3
+    cli_utils.validate_config()
+    py_bugger.main()
+
+    discovered = {event.path.name for event in received["on_file_discovered"]}
+    assert discovered == {"dog_bark.py", "name_picker.py", "system_info_script.py"}
+    assert received["on_candidate"]
+
+    planned = received["on_bug_planned"]
+    assert len(planned) == 3
+    for event in planned:
+        assert event.modification.path == event.path == event.candidate.path
+        assert event.elapsed > 0
+
+    # Every planned bug is written.
+    written = [event.modification for event in received["on_bug_written"]]
+    assert sorted(written, key=id) == sorted([e.modification for e in planned], key=id)
+
+    for event in received["on_file_parsed"]:
+        assert event.elapsed > 0
+
+    (finished,) = received["on_run_finished"]
+    assert finished.num_added == finished.num_requested == 3
+
+
+def test_dry_run_writes_nothing(received):
+    pb_config.num_bugs = 2
+    pb_config.dry_run = True
+    cli_utils.validate_config()
+    py_bugger.main()
+
+    assert len(received["on_bug_planned"]) == 2
+    assert received["on_bug_written"] == []
+
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        events.subscribe("on_bug", print)
+
+
+def test_unsubscribe():
+    events.subscribe("on_candidate", print)
+    assert events.wants("on_candidate")
+
+    events.unsubscribe("on_candidate", print)
+    assert not events.wants("on_candidate")
+    assert events.active == frozenset()
+
+
+def test_documented_example(tmp_path, test_config, monkeypatch, capsys):
+    """The example in the usage docs should run as written."""
+    path_docs = test_config.path_root / "docs" / "usage" / "index.md"
+    docs = path_docs.read_text()
+    section = docs.split("## Observing a run from Python", 1)[1]
+    example = re.search(r"```python\n(.*?)```", section, re.DOTALL).group(1)
+
+    # The example targets my_project/, relative to the current directory.
+    path_project = tmp_path / "my_project"
+    path_project.mkdir()
+    shutil.copyfile(test_config.path_dog_bark, path_project / "dog_bark.py")
+    monkeypatch.chdir(tmp_path)
+
+    exec(example, {})
+
+    output = capsys.readouterr().out
+    assert "dog_bark.py" in output
+    assert "All requested bugs inserted." in output
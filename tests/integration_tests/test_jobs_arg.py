@@ -0,0 +1,70 @@
+"""Test parsing files in parallel, with --jobs."""
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils import file_utils
+from py_bugger.utils import parse_cache
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.profiler import profiler
+
+
+def test_parallel_candidates_match_serial(sample_dir):
+    """Candidates should come back in the same order, however many jobs are used."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    kinds = list(candidate_utils.BUG_KINDS.values())
+
+    pb_config.jobs = 1
+    candidates_serial = candidate_utils.get_candidates(py_files, kinds)
+
+    # Forget candidates from the serial pass, so they're collected again.
+    candidate_index.clear()
+    pb_config.jobs = 3
+    candidates_parallel = candidate_utils.get_candidates(py_files, kinds)
+
+    assert all(candidates_serial.values())
+    assert candidates_parallel == candidates_serial
+
+
+def test_parallel_run_reproducible(sample_dir):
+    """A seeded run should make the same modifications, however many jobs are used."""
+    original_sources = {p: p.read_text() for p in sample_dir.glob("*.py")}
+
+    modified_sources = []
+    for jobs in [1, 2]:
+        # Start each run from the original code, and fresh state.
+        for path, source in original_sources.items():
+            path.write_text(source)
+        modifications.clear()
+        parse_cache.parsed_files.clear()
+
+        pb_config.target_dir = sample_dir
+        pb_config.exception_type = ("AttributeError",)
+        pb_config.num_bugs = 3
+        pb_config.jobs = jobs
+        cli_utils.validate_config()
+
+        py_bugger.main()
+
+        assert len(modifications) == 3
+        modified_sources.append({p: p.read_text() for p in original_sources})
+
+    assert modified_sources[0] == modified_sources[1]
+
+
+def test_parallel_counters_match_serial(sample_dir):
+    """Profiler counters from worker processes should be added to the parent's."""
+    py_files = file_utils.get_py_files(sample_dir, target_file="")
+    kinds = list(candidate_utils.BUG_KINDS.values())
+
+    all_counters = []
+    for jobs in [1, 3]:
+        profiler.enable()
+        pb_config.jobs = jobs
+        candidate_utils.get_candidates(py_files, kinds)
+        all_counters.append(profiler.counters)
+
+    assert all_counters[0]["files_read"] == len(py_files)
+    assert all_counters[1] == all_counters[0]
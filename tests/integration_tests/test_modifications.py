@@ -9,6 +9,9 @@ import pytest
 from py_bugger import py_bugger
 from py_bugger.cli.config import pb_config
 from py_bugger.cli import cli_utils
+from py_bugger.utils import ast_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils import file_utils
 from py_bugger.utils.modification import modifications
 
 
@@ -176,3 +179,71 @@ def test_linenums_recorded(tmp_path_factory, test_config, exception_type):
 
     assert len(modifications) == 1
     assert modifications[0].line_num > 0
+
+
+@pytest.mark.parametrize(
+    "exception_type, kind",
+    [("ModuleNotFoundError", "import"), ("AttributeError", "attribute")],
+)
+def test_every_candidate_modified(tmp_path_factory, exception_type, kind):
+    """Every candidate can be modified once, including nested and decorator nodes."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_dst = tmp_path / "chained.py"
+    path_dst.write_text(
+        "import os; import sys\n"
+        "\n"
+        "@os.path.normpath\n"
+        "def f():\n"
+        "    return sys.path.copy().count(os.sep)\n"
+    )
+    candidates = candidate_utils.get_candidates([path_dst], [kind])[kind]
+
+    pb_config.exception_type = exception_type
+    pb_config.target_file = path_dst
+    pb_config.num_bugs = 20
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    # Spans refer to the original code.
+    assert len(modifications) == len(candidates)
+    assert {m.span for m in modifications} == {c.span for c in candidates}
+    assert not any(file_utils.check_unmodified(c) for c in candidates)
+
+    # Every name was changed.
+    new_rows = ast_utils.collect_rows(path_dst.read_bytes(), [kind])[kind]
+    assert len(new_rows) == len(candidates)
+    assert all(row[4] != c.name for row, c in zip(new_rows, candidates))
+
+
+def test_decorators_in_blocks_modified(tmp_path_factory):
+    """Attributes in decorators of the first statement in a block can be modified."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_dst = tmp_path / "decorated.py"
+    path_dst.write_text(
+        "import functools\n"
+        "\n"
+        "class Dog:\n"
+        "    @functools.cache\n"
+        "    def bark(self):\n"
+        "        return 'woof'\n"
+        "\n"
+        "def outer(f):\n"
+        "    @functools.wraps(f)\n"
+        "    def inner():\n"
+        "        return f()\n"
+        "    return inner\n"
+    )
+    candidates = candidate_utils.get_candidates([path_dst], ["attribute"])["attribute"]
+    assert len(candidates) == 2
+
+    pb_config.exception_type = "AttributeError"
+    pb_config.target_file = path_dst
+    pb_config.num_bugs = 2
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 2
+    assert "functools.cache\n" not in path_dst.read_text()
+    assert "functools.wraps(f)" not in path_dst.read_text()
@@ -0,0 +1,71 @@
+"""Test passing more than one value for -e."""
+
+import shutil
+
+import pytest
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils.modification import modifications
+
+
+def test_multiple_exception_types(tmp_path_factory, test_config, monkeypatch):
+    """Only requested bugs are introduced, and each file is collected from once."""
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    filenames = ["dog_bark.py", "name_picker.py", "system_info_script.py"]
+    for filename in filenames:
+        path_src = test_config.path_sample_scripts / filename
+        shutil.copyfile(path_src, tmp_path / filename)
+
+    # Record the kinds collected from each file.
+    collected = []
+    collect_rows = candidate_utils.collect_rows
+
+    def recording_collect_rows(path, kinds):
+        collected.append((path, kinds))
+        return collect_rows(path, kinds)
+
+    monkeypatch.setattr(candidate_utils, "collect_rows", recording_collect_rows)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = ("AttributeError", "IndentationError", "AttributeError")
+    pb_config.num_bugs = 4
+    cli_utils.validate_config()
+
+    requested_bugs = py_bugger.main()
+
+    assert pb_config.exception_type == ("AttributeError", "IndentationError")
+    assert set(requested_bugs) <= {"AttributeError", "IndentationError"}
+    assert len(modifications) == 4
+
+    # Unmodified files are only collected from once, for both kinds of bugs.
+    first_pass = collected[: len(filenames)]
+    assert sorted(path.name for path, _ in first_pass) == sorted(filenames)
+    assert all(sorted(kinds) == ["attribute", "indentation"] for _, kinds in first_pass)
+    assert len(collected) <= len(filenames) + len(modifications)
+
+
+@pytest.mark.parametrize(
+    "exception_type", ["IndentationError", ("IndentationError",)], ids=["str", "tuple"]
+)
+def test_single_exception_type_forms(tmp_path_factory, test_config, exception_type):
+    """A single exception type can be set as a string, or as a one-item tuple."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    path_src = test_config.path_sample_scripts / "dog_bark.py"
+    shutil.copyfile(path_src, tmp_path / path_src.name)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = exception_type
+    pb_config.num_bugs = 2
+    cli_utils.validate_config()
+
+    requested_bugs = py_bugger.main()
+
+    assert pb_config.exception_type == ("IndentationError",)
+    assert requested_bugs == ["IndentationError", "IndentationError"]
+    assert [m.exception_induced for m in modifications] == [IndentationError] * 2
@@ -0,0 +1,102 @@
+"""Test the per-run cache of parsed files."""
+
+import shutil
+
+import pytest
+
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import parse_cache
+from py_bugger.utils.modification import modifications
+
+
+@pytest.mark.parametrize("exception_type", ["AttributeError", "ModuleNotFoundError"])
+def test_each_file_parsed_once_per_bug(
+    tmp_path_factory, test_config, count_parses, exception_type
+):
+    """Unmodified files should only be parsed once, however many bugs are requested."""
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    filenames = ["dog_bark.py", "name_picker.py", "system_info_script.py"]
+    for filename in filenames:
+        path_src = test_config.path_sample_scripts / filename
+        shutil.copyfile(path_src, tmp_path / filename)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = (exception_type,)
+    pb_config.num_bugs = 3
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    # Only files chosen for a bug are parsed with libcst, so each bug parses at most
+    # one file. A modified file is parsed again the next time it's needed, but no
+    # version of a file is ever parsed twice.
+    assert len(modifications) == 3
+    assert 1 <= len(count_parses) <= len(modifications)
+    assert len(set(count_parses)) == len(count_parses)
+
+
+def test_only_chosen_file_parsed(tmp_path_factory, test_config, count_parses):
+    """Candidates are found without libcst; only the file that gets a bug is parsed."""
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    for path_src in test_config.path_sample_scripts.glob("*.py"):
+        shutil.copyfile(path_src, tmp_path / path_src.name)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = ("AttributeError",)
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 1
+    assert len(count_parses) == 1
+
+
+def test_modified_file_invalidated(tmp_path_factory, test_config):
+    """A file that's been modified should not have a stale entry in the cache."""
+    # Copy sample code to tmp dir.
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    print(f"\nCopying code to: {tmp_path.as_posix()}")
+
+    path_src = test_config.path_sample_scripts / "dog_bark.py"
+    path_dst = tmp_path / path_src.name
+    shutil.copyfile(path_src, path_dst)
+
+    pb_config.target_file = path_dst
+    pb_config.exception_type = ("AttributeError",)
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 1
+    assert path_dst not in parse_cache.parsed_files
+
+    # Parsing again should reflect the modified source.
+    parsed_file = parse_cache.get_parsed_file(path_dst)
+    assert parsed_file.module.code == path_dst.read_text()
+
+
+def test_trees_released_after_planning(tmp_path_factory, test_config):
+    """Once bugs are planned, no parsed tree should be kept for the rest of the run."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    for filename in ["dog_bark.py", "name_picker.py"]:
+        shutil.copyfile(test_config.path_sample_scripts / filename, tmp_path / filename)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = ("AttributeError",)
+    pb_config.num_bugs = 2
+    pb_config.dry_run = True
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 2
+    assert parse_cache.parsed_files == {}
+    assert all(m.candidate.kind == "attribute" for m in modifications)
@@ -0,0 +1,99 @@
+"""Test planning every requested bug up front."""
+
+import shutil
+
+import pytest
+
+from py_bugger import buggers
+from py_bugger import py_bugger
+from py_bugger.cli.config import pb_config
+from py_bugger.cli import cli_utils
+from py_bugger.utils import apply_utils
+from py_bugger.utils import candidate_utils
+from py_bugger.utils.candidate_index import candidate_index
+from py_bugger.utils.modification import modifications
+from py_bugger.utils.profiler import profiler
+
+
+@pytest.fixture
+def sample_calls(monkeypatch):
+    """Record sample sizes for every call to sample_candidates_by_kind()."""
+    calls = []
+    sample_candidates_by_kind = candidate_utils.sample_candidates_by_kind
+
+    def recording_sample_candidates_by_kind(py_files, sample_sizes):
+        calls.append(sample_sizes)
+        return sample_candidates_by_kind(py_files, sample_sizes)
+
+    monkeypatch.setattr(
+        candidate_utils,
+        "sample_candidates_by_kind",
+        recording_sample_candidates_by_kind,
+    )
+    return calls
+
+
+def test_candidates_sampled_once(tmp_path_factory, test_config, sample_calls):
+    """Running out of candidates shouldn't cost a scan for each remaining bug."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    shutil.copyfile(test_config.path_ten_imports, tmp_path / "ten_imports.py")
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = ("ModuleNotFoundError",)
+    pb_config.num_bugs = 15
+    cli_utils.validate_config()
+
+    py_bugger.main()
+
+    assert len(modifications) == 10
+    assert sample_calls == [{"import": 15}]
+
+
+def test_all_kinds_sampled_in_one_pass(tmp_path_factory, test_config, sample_calls):
+    """Each file should be collected once, and no rows kept once they're sampled."""
+    tmp_path = tmp_path_factory.mktemp("sample_code")
+    filenames = ["dog_bark.py", "name_picker.py", "system_info_script.py"]
+    for filename in filenames:
+        shutil.copyfile(test_config.path_sample_scripts / filename, tmp_path / filename)
+
+    pb_config.target_dir = tmp_path
+    pb_config.exception_type = (
+        "ModuleNotFoundError",
+        "AttributeError",
+        "IndentationError",
+    )
+    pb_config.num_bugs = 4
+    cli_utils.validate_config()
+    profiler.enable()
+
+    requested_bugs = py_bugger.main()
+
+    assert len(sample_calls) == 1
+    assert sum(sample_calls[0].values()) == len(requested_bugs)
+    assert profiler.counters["files_scanned"] == len(filenames)
+    assert candidate_index.run_entries == {}
+
+
+def test_indentation_error_planned_first(tmp_path):
+    """A bug that breaks parsing can be planned before bugs that parse the file."""
+    path = tmp_path / "dogs.py"
+    source = "import os\n\nif True:\n    print(os.sep)\n"
+    path.write_text(source)
+    pb_config.num_bugs = 3
+
+    num_added = buggers.plan_bugs(
+        [path], ["IndentationError", "AttributeError", "ModuleNotFoundError"]
+    )
+    assert num_added == 3
+    assert path.read_text() == source
+
+    apply_utils.apply_modifications()
+    apply_utils.write_modifications()
+
+    exceptions_induced = {m.exception_induced.__name__ for m in modifications}
+    assert exceptions_induced == {
+        "IndentationError",
+        "AttributeError",
+        "ModuleNotFoundError",
+    }
+    assert path.read_text() != source
@@ -0,0 +1,96 @@
+"""Tests for utils/ast_utils.py."""
+
+import libcst as cst
+from libcst.metadata import MetadataWrapper, PositionProvider
+import pytest
+
+from py_bugger.utils import ast_utils
+
+
+SOURCE = """import os; import sys
+import os.path as osp, re
+from email.mime import text
+
+name = "café"; size = os.path.getsize(name).real
+value = (sys.argv).copy() if osp.sep else [t.upper() for t in re.I.name]
+
+@text.decorator
+def f(x: os.PathLike = sys.maxsize) -> re.Pattern:
+    return f"{x.real!r}"
+"""
+
+
+class LibcstCollector(cst.CSTVisitor):
+    """Collect positions of the nodes libcst modifiers look for."""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.positions = {"import": [], "attribute": []}
+
+    def visit_Import(self, node):
+        self._record("import", node)
+        return False
+
+    def visit_ImportFrom(self, node):
+        return False
+
+    def visit_Attribute(self, node):
+        self._record("attribute", node)
+
+    def _record(self, kind, node):
+        start, end = self.metadata[node].start, self.metadata[node].end
+        self.positions[kind].append((start.line, start.column, end.line, end.column))
+
+
+@pytest.mark.parametrize("kind", ["import", "attribute"])
+@pytest.mark.parametrize(
+    "source",
+    [SOURCE.encode(), f"# -*- coding: latin-1 -*-\n{SOURCE}".encode("latin-1")],
+    ids=["utf-8", "latin-1"],
+)
+def test_rows_match_libcst(kind, source):
+    """Rows found with ast should match libcst's positions, in libcst's order."""
+    rows = ast_utils.collect_rows(source, [kind])[kind]
+
+    wrapper = MetadataWrapper(cst.parse_module(source))
+    libcst_collector = LibcstCollector(wrapper.resolve(PositionProvider))
+    wrapper.module.visit(libcst_collector)
+    positions = libcst_collector.positions[kind]
+
+    assert positions
+    assert [row[:4] for row in rows] == positions
+
+
+def test_names():
+    rows = ast_utils.collect_rows(SOURCE.encode(), ["import", "attribute"])
+
+    assert [row[4] for row in rows["import"]] == ["os", "sys", "os.path"]
+    assert "mime" not in [row[4] for row in rows["attribute"]]
+
+
+def test_non_ascii_attribute_names():
+    """Names should be spelled as in the source, not normalized by ast."""
+    rows = ast_utils.collect_rows("obj.ﬁle = obj.ｓｅｐ\n".encode(), ["attribute"])
+
+    assert rows["attribute"] == [(1, 0, 1, 7, "ﬁle"), (1, 10, 1, 17, "ｓｅｐ")]
+
+
+def test_prefilter_skips_parse(monkeypatch):
+    """Source without any text a kind needs isn't parsed at all."""
+
+    def fail_parse(source):
+        raise AssertionError("Source should not be parsed.")
+
+    monkeypatch.setattr(ast_utils.ast, "parse", fail_parse)
+
+    source = b"def greet(name):\n    return name\n"
+    assert ast_utils.collect_rows(source, ["import", "attribute"]) == {
+        "import": [],
+        "attribute": [],
+    }
+
+
+def test_syntax_error():
+    assert ast_utils.collect_rows(b"import os\ndef broken(:\n", ["import"]) == {
+        "import": []
+    }
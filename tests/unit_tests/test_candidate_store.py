@@ -0,0 +1,88 @@
+"""Tests for utils/candidate_store.py."""
+
+from pathlib import Path
+import random
+
+import pytest
+
+from py_bugger.utils import candidate_store
+from py_bugger.utils.candidate_store import CandidateStore
+from py_bugger.utils.modification import Modification, modifications
+
+
+@pytest.fixture
+def store():
+    """Store with attribute candidates from two files."""
+    store = CandidateStore("attribute")
+    store.add_rows(
+        Path("a.py"), [(1, 0, 1, 6, "sep"), (2, 4, 2, 12, "path"), (5, 0, 5, 8, "argv")]
+    )
+    store.add_rows(Path("empty.py"), [])
+    store.add_rows(Path("b.py"), [(2, 0, 2, 7, "pi")])
+
+    yield store
+    modifications.clear()
+
+
+def test_get_candidate(store):
+    candidate = store.get_candidate(3)
+    assert candidate.path == Path("b.py")
+    assert candidate.position == (2, 0, 2, 7)
+    assert candidate.kind == "attribute"
+    assert candidate.name == "pi"
+
+
+def test_get_indices(store):
+    assert list(store.get_indices()) == [0, 1, 2, 3]
+    assert list(store.get_indices([2])) == [1, 3]
+
+
+def test_modified_spans_excluded(store):
+    modifications.append(Modification(path=Path("a.py"), span=(2, 8, 2, 12)))
+    assert list(store.get_indices()) == [0, 2, 3]
+
+
+def test_sample_is_seeded(store):
+    random.seed(10)
+    sample = store.sample(2)
+    random.seed(10)
+    assert store.sample(2) == sample
+    assert len(sample) == 2
+
+    assert len(store.sample(10)) == 4
+
+
+def test_same_indices_with_numpy(store, monkeypatch):
+    """NumPy makes filtering faster, without changing which candidates are chosen."""
+    pytest.importorskip("numpy")
+    modifications.append(Modification(path=Path("a.py"), span=(1, 3, 1, 6)))
+    with_numpy = list(store.get_indices([1, 2]))
+
+    monkeypatch.setattr(candidate_store, "_get_numpy", lambda: None)
+    assert list(store.get_indices([1, 2])) == with_numpy == [1, 3]
+
+
+@pytest.mark.parametrize("kind", ["attribute", "import", "indentation"])
+def test_modified_spans_excluded_with_numpy(kind, monkeypatch):
+    """Overlap checks should match Candidate.span, with or without NumPy."""
+    pytest.importorskip("numpy")
+    rows = [(1, 0, 1, 9, "sep"), (1, 12, 1, 20, "path"), (3, 4, 4, 2, "os")]
+    store = CandidateStore(kind)
+    store.add_rows(Path("a.py"), rows)
+
+    modifications.append(Modification(path=Path("a.py"), span=(1, 8, 1, 9)))
+    modifications.append(Modification(path=Path("a.py"), span=(4, 0, 4, 1)))
+    expected = [
+        index
+        for index in range(len(store))
+        if modifications.overlaps(Path("a.py"), store.get_candidate(index).span)
+    ]
+
+    with_numpy = list(store.get_indices())
+    monkeypatch.setattr(candidate_store, "_get_numpy", lambda: None)
+    without_numpy = list(store.get_indices())
+    modifications.clear()
+
+    assert expected
+    assert with_numpy == without_numpy
+    assert [i for i in range(len(store)) if i not in with_numpy] == expected
@@ -5,6 +5,7 @@ pb_config here, update tests to create an appropriate pb_config object.
 """
 
 from pathlib import Path
+import subprocess
 
 import pytest
 
@@ -30,6 +31,68 @@ def test_get_py_files_git():
     assert "conftest.py" not in filenames
 
 
+def test_get_py_files_git_subdir(tmp_path):
+    """Targeting a subdirectory of a repo should still use Git."""
+    files = [
+        "root.py",
+        "app/dog.py",
+        "app/pets/cat food.py",
+        "app/tests/test_dog.py",
+        "app/pets/test_cat.py",
+        "app/.venv/lib/mod.py",
+        "app/build/__init__.py",
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    # Git leaves out ignored dirs. A tracked package named build/ is still listed.
+    (tmp_path / ".gitignore").write_text(".venv/\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+
+    # An untracked file shouldn't be listed.
+    (tmp_path / "app" / "scratch.py").touch()
+
+    target_dir = tmp_path / "app"
+    py_files = file_utils.get_py_files(target_dir, target_file="")
+    rel_paths = sorted(pf.relative_to(target_dir).as_posix() for pf in py_files)
+
+    assert rel_paths == ["build/__init__.py", "dog.py", "pets/cat food.py"]
+
+    # A user pattern can re-include files that are excluded by default.
+    py_files = file_utils.get_py_files(target_dir, target_file="", exclude=["!tests/"])
+    rel_paths = sorted(pf.relative_to(target_dir).as_posix() for pf in py_files)
+
+    assert rel_paths == [
+        "build/__init__.py",
+        "dog.py",
+        "pets/cat food.py",
+        "tests/test_dog.py",
+    ]
+
+
+def test_get_py_files_git_untracked_subdir(tmp_path):
+    """An untracked or ignored subdirectory of a repo should be walked instead."""
+    (tmp_path / "root.py").touch()
+    (tmp_path / ".gitignore").write_text("ignored/\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+
+    for dir_name in ("untracked", "ignored"):
+        for file in ("dog.py", "pets/cat.py", "test_dog.py"):
+            path = tmp_path / dir_name / file
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+        target_dir = tmp_path / dir_name
+        py_files = file_utils.get_py_files(target_dir, target_file="")
+        rel_paths = sorted(pf.relative_to(target_dir).as_posix() for pf in py_files)
+
+        assert rel_paths == ["dog.py", "pets/cat.py"]
+
+
 def test_get_py_files_non_git(tmp_path_factory):
     """Test function for getting .py files from a dir not managed by Git."""
     # Build a tmp dir with some files that should be gathered, and some that
@@ -54,6 +117,58 @@ def test_get_py_files_non_git(tmp_path_factory):
     assert "test_project.py" not in filenames
 
 
+def test_get_py_files_non_git_excluded_dirs(tmp_path):
+    """Excluded dirs are matched by path component, at any depth."""
+    files = [
+        "dog.py",
+        "latest_builds/cat.py",
+        "mytests/bird.py",
+        ".venv/lib/python3.12/site-packages/pkg/mod.py",
+        "venv/mod.py",
+        "src/site-packages/pkg/mod.py",
+        "web/node_modules/pkg/mod.py",
+        "third_party/pkg/mod.py",
+        "src/build/mod.py",
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    py_files = file_utils.get_py_files(tmp_path, target_file="")
+    rel_paths = sorted(pf.relative_to(tmp_path).as_posix() for pf in py_files)
+
+    assert rel_paths == ["dog.py", "latest_builds/cat.py", "mytests/bird.py"]
+
+
+def test_get_py_files_non_git_ignore_files(tmp_path):
+    """.gitignore files apply to their own dir. .pybuggerignore and args apply too."""
+    files = [
+        "dog.py",
+        "cat.py",
+        "generated.py",
+        "pets/bird.py",
+        "pets/local_settings.py",
+        "pets/fish/goldfish.py",
+        "scripts/run.py",
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    (tmp_path / ".gitignore").write_text("generated.py\n")
+    (tmp_path / "pets" / ".gitignore").write_text("/local_settings.py\nfish/\n")
+    (tmp_path / ".pybuggerignore").write_text("# Not part of the project.\nscripts/\n")
+
+    py_files = file_utils.get_py_files(
+        tmp_path, target_file="", include=["*.py"], exclude=["cat.py"]
+    )
+    rel_paths = sorted(pf.relative_to(tmp_path).as_posix() for pf in py_files)
+
+    assert rel_paths == ["dog.py", "pets/bird.py"]
+
+
 def test_get_py_files_target_file(tmp_path_factory):
     """Test function for getting .py files when target_file is set."""
     # Build a tmp dir with some files that should be gathered, and some that
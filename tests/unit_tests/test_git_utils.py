@@ -0,0 +1,81 @@
+"""Tests for utils/git_utils.py."""
+
+import hashlib
+import subprocess
+
+import pytest
+
+from py_bugger.utils import git_utils
+from py_bugger.utils.git_utils import git_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_git_cache():
+    git_cache.clear()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repo with one commit, and a pets/ subdirectory."""
+    for file in ["dog.py", "pets/cat.py"]:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"print('{path.stem}')\n")
+
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(git + ["add", "."], cwd=tmp_path, check=True)
+    subprocess.run(
+        git + ["commit", "-q", "-m", "Initial state."], cwd=tmp_path, check=True
+    )
+    return tmp_path
+
+
+def test_get_root(repo, tmp_path_factory):
+    assert git_utils.get_root(repo / "pets") == repo
+    assert git_utils.get_root(tmp_path_factory.mktemp("not_a_repo")) is None
+
+
+def test_status_scoped(repo):
+    """Changes outside the pathspec don't affect the status."""
+    (repo / "dog.py").write_text("print('woof')\n")
+
+    assert git_utils.get_status(repo / "pets") == []
+    assert git_utils.get_status(repo / "pets", "cat.py") == []
+    assert git_utils.get_status(repo) == [" M dog.py"]
+
+
+def test_status_untracked_files(repo):
+    (repo / "pets" / "bird.py").touch()
+
+    assert git_utils.get_status(repo / "pets") == ["?? pets/bird.py"]
+    assert git_utils.get_status(repo / "pets", untracked_files="no") == []
+
+
+def test_status_cached(repo, monkeypatch):
+    calls = []
+    run_git = git_utils.run_git
+
+    def recording_run_git(git_dir, args, text=True):
+        calls.append(args)
+        return run_git(git_dir, args, text)
+
+    monkeypatch.setattr(git_utils, "run_git", recording_run_git)
+
+    git_utils.get_status(repo)
+    git_utils.get_status(repo)
+    assert len(calls) == 1
+
+
+def test_clean_blob_ids(repo):
+    """Blob ids are only used once a status check shows the files are clean."""
+    path = repo / "pets" / "cat.py"
+    assert git_utils.ls_files(repo, ["*.py"]) == ["dog.py", "pets/cat.py"]
+    assert git_utils.get_clean_blob_id(path) is None
+
+    git_utils.get_status(repo / "pets")
+
+    data = path.read_bytes()
+    blob_id = hashlib.sha1(f"blob {len(data)}\0".encode() + data).hexdigest()
+    assert git_utils.get_clean_blob_id(path) == blob_id
+    assert git_utils.get_clean_blob_id(repo / "dog.py") is None
@@ -0,0 +1,59 @@
+"""Tests for utils/modification.py."""
+
+from pathlib import Path
+
+import pytest
+
+from py_bugger.utils.modification import Modification, ModificationRegistry
+
+
+@pytest.fixture
+def registry():
+    """Registry with two modifications on line 3 of one file."""
+    registry = ModificationRegistry()
+    registry.append(Modification(path=Path("a.py"), span=(3, 4, 3, 8)))
+    registry.append(Modification(path=Path("a.py"), span=(3, 12, 3, 15)))
+    return registry
+
+
+@pytest.mark.parametrize(
+    "span, expected",
+    [
+        ((3, 0, 3, 4), False),
+        ((3, 0, 3, 5), True),
+        ((3, 7, 3, 12), True),
+        ((3, 8, 3, 12), False),
+        ((3, 14, 3, 20), True),
+        ((3, 15, 3, 20), False),
+        ((1, 0, 5, 0), True),
+        ((2, 0, 2, 80), False),
+    ],
+)
+def test_overlaps(registry, span, expected):
+    assert registry.overlaps(Path("a.py"), span) == expected
+
+
+def test_overlaps_other_path(registry):
+    assert not registry.overlaps(Path("b.py"), (3, 0, 3, 80))
+
+
+def test_list_behavior(registry):
+    registry.append(Modification(path=Path("b.py")))
+
+    assert len(registry) == 3
+    assert registry[0].span == (3, 4, 3, 8)
+    assert [m.path.name for m in registry] == ["a.py", "a.py", "b.py"]
+
+    registry.clear()
+    assert len(registry) == 0
+    assert not registry.overlaps(Path("a.py"), (3, 0, 3, 80))
+
+
+def test_path_modifications(registry):
+    """Modifications for one path are sorted by where their spans start."""
+    registry.append(Modification(path=Path("a.py"), span=(1, 0, 1, 10)))
+
+    assert registry.paths == [Path("a.py")]
+    spans = [m.span for m in registry.get_path_modifications(Path("a.py"))]
+    assert spans == [(1, 0, 1, 10), (3, 4, 3, 8), (3, 12, 3, 15)]
+    assert registry.get_path_modifications(Path("b.py")) == []
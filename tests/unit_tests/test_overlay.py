@@ -0,0 +1,56 @@
+"""Test the in-memory overlay of modified files."""
+
+from py_bugger.utils.overlay import Overlay
+
+
+def test_writes_stay_in_memory(tmp_path):
+    path = tmp_path / "dog.py"
+    path.write_bytes(b"print('woof')\n")
+
+    overlay = Overlay()
+    overlay.write_bytes(path, b"print('wooof')\n")
+
+    assert overlay.read_bytes(path) == b"print('wooof')\n"
+    assert path.read_bytes() == b"print('woof')\n"
+
+
+def test_get_patch(tmp_path):
+    (tmp_path / "pets").mkdir()
+    path = tmp_path / "pets" / "dog.py"
+    path.write_bytes(b"import os\nprint('woof')")
+
+    overlay = Overlay()
+    overlay.write_bytes(path, b"import ooss\nprint('woof')")
+
+    patch = overlay.get_patch(tmp_path)
+    assert patch == (
+        b"diff --git a/pets/dog.py b/pets/dog.py\n"
+        b"--- a/pets/dog.py\n"
+        b"+++ b/pets/dog.py\n"
+        b"@@ -1,2 +1,2 @@\n"
+        b"-import os\n"
+        b"+import ooss\n"
+        b" print('woof')\n"
+        b"\\ No newline at end of file\n"
+    )
+
+
+def test_get_patch_keeps_line_endings(tmp_path):
+    path = tmp_path / "dog.py"
+    path.write_bytes(b"import os\r\nprint('woof')\r\n")
+
+    overlay = Overlay()
+    overlay.write_bytes(path, b"import ooss\r\nprint('woof')\r\n")
+
+    patch = overlay.get_patch(tmp_path)
+    assert b"-import os\r\n+import ooss\r\n print('woof')\r\n" in patch
+
+
+def test_unchanged_file_not_in_patch(tmp_path):
+    path = tmp_path / "dog.py"
+    path.write_bytes(b"print('woof')\n")
+
+    overlay = Overlay()
+    overlay.write_bytes(path, b"print('woof')\n")
+
+    assert overlay.get_patch(tmp_path) == b""
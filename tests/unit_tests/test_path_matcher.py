@@ -0,0 +1,96 @@
+"""Tests for utils/path_matcher.py."""
+
+from pathlib import Path
+
+import pytest
+
+from py_bugger.utils import path_matcher
+from py_bugger.utils.path_matcher import PathMatcher
+
+
+def get_matcher(lines, include=()):
+    return PathMatcher(
+        user_patterns=path_matcher._translate_lines(lines),
+        include_patterns=path_matcher._translate_lines(include),
+    )
+
+
+@pytest.mark.parametrize(
+    "pattern, rel_path, is_dir, excluded",
+    [
+        # Unanchored patterns match at any depth.
+        ("*.py", "dog.py", False, True),
+        ("*.py", "pets/dog.py", False, True),
+        ("dog.py", "pets/dog.py", False, True),
+        ("dog.py", "pets/hotdog.py", False, False),
+        # Anchored patterns match relative to the root.
+        ("/dog.py", "dog.py", False, True),
+        ("/dog.py", "pets/dog.py", False, False),
+        ("pets/*.py", "pets/dog.py", False, True),
+        ("pets/*.py", "pets/dogs/dog.py", False, False),
+        # Directory patterns exclude the directory and everything in it.
+        ("pets/", "pets", True, True),
+        ("pets/", "pets/dogs/dog.py", False, True),
+        ("pets/", "pets", False, False),
+        ("pets", "pets/dog.py", False, True),
+        # Recursive wildcards.
+        ("**/dogs", "pets/old/dogs", True, True),
+        ("pets/**/dog.py", "pets/dog.py", False, True),
+        ("pets/**/dog.py", "pets/old/dogs/dog.py", False, True),
+        # Single character wildcards and character classes.
+        ("dog?.py", "dog1.py", False, True),
+        ("dog?.py", "dog.py", False, False),
+        ("dog[0-9].py", "dog7.py", False, True),
+        ("dog[!0-9].py", "dog7.py", False, False),
+    ],
+)
+def test_patterns(pattern, rel_path, is_dir, excluded):
+    matcher = get_matcher([pattern])
+    assert matcher.is_excluded(rel_path, is_dir) == excluded
+
+
+def test_comments_and_blank_lines():
+    matcher = get_matcher(["# dog.py", "", "   "])
+    assert not matcher.is_excluded("dog.py")
+
+
+def test_last_pattern_wins():
+    matcher = get_matcher(["*.py", "!dog.py"])
+    assert not matcher.is_excluded("dog.py")
+    assert matcher.is_excluded("cat.py")
+
+    matcher = get_matcher(["!dog.py", "*.py"])
+    assert matcher.is_excluded("dog.py")
+
+
+def test_defaults():
+    matcher = path_matcher.get_path_matcher(Path("/nonexistent"))
+    assert matcher.is_excluded("tests", is_dir=True)
+    assert matcher.is_excluded("src/pkg/tests/helpers.py")
+    assert matcher.is_excluded("src/conftest.py")
+    assert matcher.is_excluded("src/test_dog.py")
+    assert matcher.is_excluded(".venv/lib/python3.12/site-packages", is_dir=True)
+    assert not matcher.is_excluded("latest_builds", is_dir=True)
+    assert not matcher.is_excluded("src/dog_test_helpers.py")
+
+
+def test_user_patterns_override_defaults():
+    matcher = path_matcher.get_path_matcher(Path("/nonexistent"), exclude=["!tests/"])
+    assert not matcher.is_excluded("tests", is_dir=True)
+    assert not matcher.is_excluded("tests/helpers.py")
+
+
+def test_include():
+    matcher = get_matcher(["cat.py"], include=["pets/"])
+    assert not matcher.is_excluded("pets/dog.py")
+    assert not matcher.is_excluded("zoo", is_dir=True)
+    assert matcher.is_excluded("zoo/lion.py")
+    assert matcher.is_excluded("pets/cat.py")
+
+
+def test_with_gitignore():
+    matcher = get_matcher([]).with_gitignore(["*.py", "/local.txt"], "pets")
+    assert matcher.is_excluded("pets/dogs/dog.py")
+    assert not matcher.is_excluded("dog.py")
+    assert matcher.is_excluded("pets/local.txt")
+    assert not matcher.is_excluded("pets/dogs/local.txt")
@@ -0,0 +1,49 @@
+"""Test recording phase times and counters."""
+
+import time
+
+from py_bugger.utils.profiler import Profiler
+
+
+def test_disabled_records_nothing():
+    profiler = Profiler()
+    with profiler.phase("parse"):
+        profiler.count("files_parsed")
+
+    assert profiler.phases == {}
+    assert profiler.counters == {}
+
+
+def test_nested_phases_are_exclusive():
+    profiler = Profiler()
+    profiler.enable()
+
+    with profiler.phase("transform"):
+        with profiler.phase("parse"):
+            time.sleep(0.05)
+
+    report = profiler.get_report()
+    assert report["phases"]["parse"]["wall"] >= 0.05
+    assert report["phases"]["transform"]["wall"] < 0.05
+    assert report["phases"]["transform"]["calls"] == 1
+
+
+def test_report_order_and_counters():
+    profiler = Profiler()
+    profiler.enable()
+
+    with profiler.phase("write"):
+        pass
+    with profiler.phase("discovery"):
+        pass
+    profiler.count("files_read")
+    profiler.count("bytes_read", 100)
+    profiler.count("bytes_read", 20)
+
+    report = profiler.get_report()
+    assert list(report["phases"]) == ["discovery", "write"]
+    assert report["counters"] == {"bytes_read": 120, "files_read": 1}
+
+    table = profiler.format_report()
+    assert "discovery" in table
+    assert "bytes_read" in table